@@ -0,0 +1,51 @@
+#!/bin/bash
+# Non-interactive ring check with test_ring.py:
+#   1. a full 4-node ring must deliver every test message back to Node 0
+#   2. the same ring with Node 2 down must be reported as broken
+# Exits with status 0 only if both checks behave as expected.
+
+cd "$(dirname "$0")"
+
+# Kill any existing instances
+pkill -f "python test_ring.py" 2>/dev/null
+
+start_nodes() {
+    PIDS=""
+    for node in "$@"; do
+        python test_ring.py "$node" > /dev/null 2>&1 &
+        PIDS="$PIDS $!"
+        sleep 0.5
+    done
+}
+
+stop_nodes() {
+    kill $PIDS 2>/dev/null
+    wait $PIDS 2>/dev/null
+}
+
+trap 'stop_nodes; exit 1' INT
+
+FAILED=0
+
+echo "🔗 Check 1: full ring (Nodes 0-3)"
+start_nodes 3 2 1
+if python test_ring.py 0 --rounds 3; then
+    echo "✅ Full ring verified"
+else
+    echo "❌ Full ring reported as broken"
+    FAILED=1
+fi
+stop_nodes
+
+echo ""
+echo "🔗 Check 2: broken ring (Node 2 down)"
+start_nodes 3 1
+if python test_ring.py 0 --rounds 1; then
+    echo "❌ Broken ring reported as working"
+    FAILED=1
+else
+    echo "✅ Broken ring detected"
+fi
+stop_nodes
+
+exit $FAILED
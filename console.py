@@ -0,0 +1,67 @@
+# Background console output shared by the game and network threads.
+import queue
+import sys
+import threading
+import time
+
+_second_cache = (None, "")  # (whole second, "%H:%M:%S" text) of the last formatted timestamp
+
+def format_timestamp(ts):
+    """Format a time.time() value as HH:MM:SS.mmm, reusing the strftime result within the same second."""
+    global _second_cache
+    second = int(ts)
+    cached_second, text = _second_cache
+    if second != cached_second:
+        text = time.strftime("%H:%M:%S", time.localtime(second))
+        _second_cache = (second, text)
+    return f"{text}.{int((ts - second) * 1000):03d}"
+
+
+class ConsoleWriter:
+    """Writes lines to stdout from a single background thread.
+
+    Callers capture time.time() when the message is produced; timestamp formatting
+    and the actual write happen on the writer thread, off the packet-handling path.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, text, ts=None):
+        """Queue a line for output; ts (a time.time() value) adds a [HH:MM:SS.mmm] prefix."""
+        self._queue.put((ts, text))
+
+    def flush(self):
+        """Block until every queued line has been written (call before prompting or clearing)."""
+        self._queue.join()
+
+    def _run(self):
+        get_nowait = self._queue.get_nowait
+        while True:
+            batch = [self._queue.get()]
+            # Whatever piled up while we were blocked goes out in the same write
+            try:
+                while True:
+                    batch.append(get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                lines = []
+                for ts, text in batch:
+                    if ts is None:
+                        lines.append(f"{text}\n")
+                    else:
+                        lines.append(f"[{format_timestamp(ts)}] {text}\n")
+                self.stream.write("".join(lines))
+                self.stream.flush()
+            except Exception:
+                pass  # Never let a broken stdout kill the writer thread
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+console = ConsoleWriter()
@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
+import array
+import itertools
 import os
 import queue
 import random
+import sched
 import time
 import argparse
 import threading
 import signal
 import sys
+from collections import namedtuple
 from datetime import datetime
-from network import NetworkNode
+from console import console, format_timestamp
+from network import MessageInbox, NetworkNode
 import protocol
 
 # Game Configuration Constants
@@ -26,10 +31,91 @@ SHOOT_MOON_POINTS = 26
 INPUT_TIMEOUT = 15  # 30 seconds for user input
 TOKEN_TIMEOUT = 30  # 60 seconds to detect stuck tokens
 GAME_TIMEOUT = 300  # 5 minutes maximum per hand
+NO_ACTIVITY_WARNING = 30  # Seconds of silence before warning that the game may be stuck
+RING_RETURN_TIMEOUT = 2.0  # Max wait for our own message to come back around the ring
+
+# Set HEARTS_SEED (an integer) to make the dealer's shuffles reproducible, e.g. for replaying a game
+SEED_ENV_VAR = "HEARTS_SEED"
+
+# Pass direction for hand N is PASS_CYCLE[(N - 1) & 3]
+PASS_CYCLE = (protocol.PASS_LEFT, protocol.PASS_RIGHT, protocol.PASS_ACROSS, protocol.PASS_NONE)
+PASS_TARGETS = tuple(  # PASS_TARGETS[direction][player_id] -> receiving player, None for PASS_NONE
+    tuple(None if direction == protocol.PASS_NONE else (player_id + offset) & 3 for player_id in range(4))
+    for direction, offset in zip(PASS_CYCLE, (1, -1, 2, 0))
+)
+
+# START_PHASE payloads never change, so all of them are built once
+TRICKS_PHASE_PAYLOAD = bytes((protocol.PHASE_TRICKS,))
+PASSING_PHASE_PAYLOADS = tuple(bytes((protocol.PHASE_PASSING, direction)) for direction in PASS_CYCLE)  # Indexed by protocol.PASS_*
 
 # UI Constants
-CARD_SYMBOLS = {"DIAMONDS": "♦", "CLUBS": "♣", "HEARTS": "♥", "SPADES": "♠"}
-PASS_DIRECTION_NAMES = {0: "LEFT", 1: "RIGHT", 2: "ACROSS", 3: "NONE"}
+SUIT_SYMBOLS = ("♦", "♣", "♥", "♠")  # Indexed by protocol.SUITS id
+PASS_DIRECTION_NAMES = ("LEFT", "RIGHT", "ACROSS", "NONE")  # Indexed by protocol.PASS_*
+PHASE_NAMES = ("PASSING", "TRICKS")  # Indexed by protocol.PHASE_*
+BANNER = "=" * 60
+SHORT_BANNER = "=" * 40
+GAME_OVER_HEADER = f"{BANNER}\n🎯 GAME OVER!\n{BANNER}"
+HAND_SUMMARY_VIEW_HEADER = f"{BANNER}\n📊 HAND SUMMARY (view)\n{BANNER}"
+GAME_OVER_VIEW_HEADER = f"{BANNER}\n🎯 GAME OVER (results received)\n{BANNER}"
+CLEAR_SCREEN_SEQUENCE = "\x1b[2J\x1b[H"  # ANSI: erase display, cursor home
+CLEAR_SCREEN_ENABLED = sys.stdout.isatty()  # Decided once; piped/redirected output is never cleared
+
+# Card Lookup Tables
+# Every valid card byte is decoded once at import time; invalid bytes map to None / 0.
+CardInfo = namedtuple("CardInfo", "value suit suit_id rank symbol points")
+
+def _build_card_table():
+    """Build the 256-entry card table indexed by card byte."""
+    table = [None] * 256
+    for suit, suit_id in protocol.SUITS.items():
+        for value, rank in protocol.VALUES.items():
+            if suit == "HEARTS":
+                points = 1
+            elif value == "Q" and suit == "SPADES":
+                points = 13
+            else:
+                points = 0
+            table[protocol.encode_card(value, suit)] = CardInfo(value, suit, suit_id, rank, SUIT_SYMBOLS[suit_id], points)
+    return tuple(table)
+
+CARD_TABLE = _build_card_table()
+RANK_BY_BYTE = bytes(info.rank if info else 0 for info in CARD_TABLE)
+SUIT_BY_BYTE = bytes(info.suit_id if info else 0xFF for info in CARD_TABLE)
+POINTS_BY_BYTE = bytes(info.points if info else 0 for info in CARD_TABLE)
+IS_HEARTS_BY_BYTE = bytes(1 if info and info.suit == "HEARTS" else 0 for info in CARD_TABLE)
+CARD_STR = tuple(f"{info.value}{info.symbol}" if info else f"?({card_byte:02x})"
+                 for card_byte, info in enumerate(CARD_TABLE))  # Display text, e.g. "Q♠"
+TWO_OF_CLUBS = protocol.encode_card("2", "CLUBS")
+QUEEN_OF_SPADES = protocol.encode_card("Q", "SPADES")
+PLAY_CARD_PAYLOADS = tuple(bytes((card_byte,)) for card_byte in range(64))  # One-byte PLAY_CARD payload per card byte
+BASE_DECK = bytes(protocol.encode_card(v, s) for s in protocol.SUITS for v in protocol.VALUES)  # Unshuffled, suit by suit
+
+# Hand Bitmasks
+# A hand is an int with bit N set when card byte N is held (card bytes are below 64).
+SUIT_MASKS = tuple(0x3FFE << (suit_id * 16) for suit_id in range(4))  # Values 1-13, indexed by suit id
+HEARTS_MASK = SUIT_MASKS[protocol.SUITS["HEARTS"]]
+POINT_CARDS_MASK = HEARTS_MASK | (1 << QUEEN_OF_SPADES)
+
+def _mask_from_cards(cards):
+    """Build a hand bitmask from an iterable of card bytes."""
+    mask = 0
+    for card_byte in cards:
+        mask |= 1 << card_byte
+    return mask
+
+def _cards_from_mask(mask):
+    """List the card bytes set in a hand bitmask, in ascending (suit, value) order."""
+    cards = bytearray()
+    while mask:
+        lowest = mask & -mask
+        cards.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return bytes(cards)
+
+def _score_lines(scores, winner_id=None):
+    """Format one indented "Player N: X points" line per player, marking winner_id."""
+    return "\n".join([f"  Player {player_id}: {score} points{' 🏆 WINNER!' if player_id == winner_id else ''}"
+                      for player_id, score in enumerate(scores)])
 
 class TimeoutInput:
     """Helper class for input with timeout."""
@@ -40,6 +126,8 @@ class TimeoutInput:
         
     def input_with_timeout(self, prompt):
         """Get input with timeout. Returns None if timeout occurs."""
+        console.flush()  # Queued output must appear before the prompt
+        
         def target():
             try:
                 self.result = input(prompt)
@@ -63,6 +151,27 @@ class HeartsGame:
     Player 0 acts as the dealer/coordinator.
     """
     
+    # Every attribute is listed here and assigned in __init__ (dealer-only ones are None elsewhere)
+    __slots__ = (
+        # Identity and options
+        "player_id", "is_dealer", "verbose_mode", "auto_mode", "log_file",
+        # Hand and score state
+        "hand_mask", "hand", "game_started", "cards_received", "hand_scores", "total_scores",
+        "game_over", "hand_number", "has_token",
+        # Phase state
+        "current_phase", "pass_direction", "cards_to_pass", "cards_passed", "passing_complete",
+        # Trick state
+        "trick_pids", "trick_cards", "deferred_plays", "trick_count", "hearts_broken", "is_first_trick",
+        "played_card_this_trick", "_hearts_broken_announced", "local_trick_display_count",
+        # Network
+        "_seq_iter", "network_node", "message_queue", "message_handlers",
+        "phase_start_handlers", "phase_token_handlers",
+        # Delayed actions
+        "_sched", "_sched_wakeup",
+        # Dealer only
+        "_rng", "pass_cards_received_mask", "two_clubs_holder", "trick_winner", "trick_points_won",
+    )
+    
     def __init__(self, player_id, verbose_mode=False, auto_mode=False):
         """Initialize a Hearts game player."""
         self.player_id = player_id
@@ -79,18 +188,30 @@ class HeartsGame:
         self._initialize_game_state()
         
         # Network
-        self.seq_counter = 0
+        self._seq_iter = itertools.count()  # Shared by the game loop and dealer threads
         self.network_node = None
-        self.message_queue = queue.Queue()
+        self.message_queue = MessageInbox()
+        
+        # One long-lived worker runs every delayed action (see _schedule)
+        self._sched = sched.scheduler(time.monotonic, time.sleep)
+        self._sched_wakeup = threading.Event()
         
         # Dealer-specific state
         if self.is_dealer:
             self._initialize_dealer_state()
+        else:
+            self._rng = None
+            self.pass_cards_received_mask = None
+            self.two_clubs_holder = None
+            self.trick_winner = None
+            self.trick_points_won = None
         
         # Message handlers
         self.message_handlers = {
             protocol.GAME_START: self.handle_game_start,
             protocol.DEAL_HAND: self.handle_deal_hand,
+            protocol.DEAL_ALL_HANDS: self.handle_deal_all_hands,
+            protocol.HAND_SUMMARY_AND_DEAL: self.handle_hand_summary_and_deal,
             protocol.START_PHASE: self.handle_start_phase,
             protocol.TOKEN_PASS: self.handle_token_pass,
             protocol.PASS_CARDS: self.handle_pass_cards,
@@ -99,6 +220,16 @@ class HeartsGame:
             protocol.HAND_SUMMARY: self.handle_hand_summary,
             protocol.GAME_OVER: self.handle_game_over,
         }
+        
+        # Per-phase handlers for START_PHASE and for receiving the token
+        self.phase_start_handlers = {
+            protocol.PHASE_PASSING: self._on_passing_phase_start,
+            protocol.PHASE_TRICKS: self._on_tricks_phase_start,
+        }
+        self.phase_token_handlers = {
+            protocol.PHASE_PASSING: self._on_passing_token,
+            protocol.PHASE_TRICKS: self._handle_tricks_turn,
+        }
 
     def _setup_game_log(self):
         """Setup game log file for dealer."""
@@ -120,7 +251,7 @@ class HeartsGame:
             return
         
         try:
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            timestamp = format_timestamp(time.time())
             log_entry = f"[{timestamp}] [{event_type}] {message}\n"
             
             if extra_data:
@@ -133,16 +264,20 @@ class HeartsGame:
 
     def clear_screen(self):
         """Clear the terminal screen only if verbose mode is disabled."""
-        if not self.verbose_mode:
-            os.system('clear')
+        if CLEAR_SCREEN_ENABLED and not self.verbose_mode:
+            console.flush()  # Don't let queued output land after the clear
+            sys.stdout.write(CLEAR_SCREEN_SEQUENCE)
+            sys.stdout.flush()
 
     def _initialize_game_state(self):
         """Initialize basic game state variables."""
-        self.hand = []
+        self.hand_mask = 0  # Bitmask of held cards (see _mask_from_cards)
+        self.hand = b""  # Sorted card bytes derived from hand_mask, used for display/index selection
         self.game_started = False
         self.cards_received = False
-        self.hand_scores = [0, 0, 0, 0]
-        self.total_scores = [0, 0, 0, 0]
+        # Fixed-size int arrays, updated in place for the whole game
+        self.hand_scores = array.array("i", [0, 0, 0, 0])
+        self.total_scores = array.array("i", [0, 0, 0, 0])
         self.game_over = False
         self.hand_number = 1
         self.has_token = (self.player_id == 0)
@@ -154,21 +289,27 @@ class HeartsGame:
         self.cards_passed = False
         self.passing_complete = False
         
-        # Trick management
-        self.current_trick = []
+        # Trick management: parallel arrays, one entry per card played so far
+        self.trick_pids = bytearray()
+        self.trick_cards = bytearray()
+        self.deferred_plays = []  # PLAY_CARDs for the next trick that arrived before this trick's summary
         self.trick_count = 0
         self.hearts_broken = False
         self.is_first_trick = True
         
         # CRITICAL FIX: Prevent multiple card plays in same trick
         self.played_card_this_trick = False
+        self._hearts_broken_announced = False
+        self.local_trick_display_count = 0  # Tricks shown so far this hand (TRICK_SUMMARY count)
 
     def _initialize_dealer_state(self):
         """Initialize dealer-specific state variables."""
-        self.pass_cards_received = set()
+        seed = os.environ.get(SEED_ENV_VAR)
+        self._rng = random.Random(int(seed) if seed else None)  # Private RNG used for shuffling
+        self.pass_cards_received_mask = 0  # Bit N set once player N has passed
         self.two_clubs_holder = None
         self.trick_winner = None
-        self.trick_points_won = [0, 0, 0, 0]
+        self.trick_points_won = array.array("i", [0, 0, 0, 0])
 
     # ============================================================================
     # UTILITY METHODS
@@ -181,20 +322,24 @@ class HeartsGame:
             
         source_id = self.player_id if source_id is None else source_id
         
+        # Only the time is captured here; formatting and writing happen on the console thread
         if timestamp:
-            ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
             if isinstance(source_id, int):
-                print(f"[{ts}] Player {source_id}: {message}")
+                console.write(f"Player {source_id}: {message}", time.time())
             else:
-                print(f"[{ts}] {source_id}: {message}")
+                console.write(f"{source_id}: {message}", time.time())
         else:
-            print(message)
+            console.write(message)
+
+    def _set_hand_mask(self, hand_mask):
+        """Replace the held cards and refresh the sorted hand used for display."""
+        self.hand_mask = hand_mask
+        self.hand = _cards_from_mask(hand_mask)
 
     def get_next_seq(self):
         """Get the next sequence number for outgoing messages."""
-        val = self.seq_counter
-        self.seq_counter = (self.seq_counter + 1) % 256
-        return val
+        # next() on itertools.count is a single C call, so concurrent senders never reuse a value
+        return next(self._seq_iter) & 0xFF
 
     def display_hand(self):
         """Display the current hand with card indices."""
@@ -202,35 +347,19 @@ class HeartsGame:
             self.output_message("No cards in hand", level="INFO")
             return
             
-        self.output_message("Hand:", level="INFO")
-        cards_str = []
-        
-        for i, card_byte in enumerate(self.hand):
-            try:
-                value, suit = protocol.decode_card(card_byte)
-                cards_str.append(f"[{i}] {value}{CARD_SYMBOLS[suit]}")
-            except:
-                cards_str.append(f"[{i}] ?({card_byte:02x})")
-        
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{ts}]   " + " ".join(cards_str))
+        # Header and cards go out as one console write
+        cards_str = " ".join([f"[{i}] {CARD_STR[card_byte]}" for i, card_byte in enumerate(self.hand)])
+        self.output_message(f"Hand:\n  {cards_str}", level="INFO")
 
     def _format_card_display(self, card_byte):
         """Format a single card for display."""
-        try:
-            value, suit = protocol.decode_card(card_byte)
-            return f"{value}{CARD_SYMBOLS[suit]}"
-        except:
-            return f"?({card_byte:02x})"
+        return CARD_STR[card_byte]
 
     def _get_pass_target(self, direction):
-        """Get the target player ID for card passing based on direction."""
-        pass_targets = {
-            protocol.PASS_LEFT: (self.player_id + 1) % 4,
-            protocol.PASS_RIGHT: (self.player_id - 1) % 4,
-            protocol.PASS_ACROSS: (self.player_id + 2) % 4
-        }
-        return pass_targets.get(direction)
+        """Get the target player ID for card passing based on direction (None for PASS_NONE)."""
+        if 0 <= direction < 4:
+            return PASS_TARGETS[direction][self.player_id]
+        return None
 
     # ============================================================================
     # NETWORK METHODS
@@ -239,7 +368,7 @@ class HeartsGame:
     def start_network(self):
         """Initialize and start the network node."""
         my_port = PORTS[self.player_id]
-        next_player_id = (self.player_id + 1) % 4
+        next_player_id = (self.player_id + 1) & 3
         next_node_ip = NEXT_NODE_IPS[self.player_id]
         next_node_port = PORTS[next_player_id]
         
@@ -249,6 +378,22 @@ class HeartsGame:
         )
         self.network_node.start()
         self.output_message(f"Network started on port {my_port}", level="DEBUG")
+        threading.Thread(target=self._run_scheduler, daemon=True).start()
+
+    def _schedule(self, delay, action, *args):
+        """Run action(*args) on the scheduler thread after delay seconds."""
+        self._sched.enter(delay, 1, action, args)
+        self._sched_wakeup.set()
+
+    def _run_scheduler(self):
+        """Scheduler worker: sleeps until an action is scheduled, then runs everything that is due."""
+        while True:
+            self._sched_wakeup.wait()
+            self._sched_wakeup.clear()
+            try:
+                self._sched.run()
+            except Exception as e:
+                self.output_message(f"Scheduled action failed: {e}", level="ERROR")
 
     def pass_token_to_player(self, target_player):
         """Pass the token to another player."""
@@ -256,16 +401,17 @@ class HeartsGame:
             return
             
         self.has_token = False
-        self.network_node.send_message(
-            protocol.TOKEN_PASS, self.player_id, protocol.BROADCAST_ID, 
-            self.get_next_seq(), bytes([target_player])
+        # Unicast: only the new holder dispatches it, the other nodes just forward
+        seq = self.network_node.send_message(
+            protocol.TOKEN_PASS, self.player_id, target_player, self.get_next_seq()
         )
         
-        identifier = "Dealer" if self.is_dealer else self.player_id
-        self.output_message(f"Passed token to Player {target_player}", level="DEBUG", source_id=identifier)
+        if self.verbose_mode:
+            identifier = "Dealer" if self.is_dealer else self.player_id
+            self.output_message(f"Passed token to Player {target_player}", level="DEBUG", source_id=identifier)
         
-        # Add delay after token passing for network reliability
-        time.sleep(0.2)
+        # Wait until the token pass has gone around the ring instead of a fixed delay
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
 
     # ============================================================================
     # GAME INITIALIZATION METHODS (DEALER ONLY)
@@ -281,43 +427,51 @@ class HeartsGame:
         self.pass_direction = protocol.PASS_LEFT
         
         # Send game start message
-        self.network_node.send_message(
+        seq = self.network_node.send_message(
             protocol.GAME_START, self.player_id, protocol.BROADCAST_ID, self.get_next_seq()
         )
         
-        # Increased delay for game start message propagation
-        time.sleep(1.0)
+        # Deal as soon as every player has seen the game start
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
         self.deal_cards()
-        # Increased delay after dealing cards
-        time.sleep(1.5)
         self.start_passing_phase()
 
-    def deal_cards(self):
-        """Create and deal a shuffled deck to all players (dealer only)."""
+    def deal_cards(self, hand_summary=None):
+        """Create and deal a shuffled deck to all players (dealer only).
+        
+        If hand_summary (a packed HAND_SUMMARY payload) is given, it is sent in the
+        same datagram as the deck, as one HAND_SUMMARY_AND_DEAL message.
+        """
         if not self.is_dealer or not self.network_node:
             return
             
-        # Create full deck
-        suits = ["DIAMONDS", "CLUBS", "HEARTS", "SPADES"]
-        values = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-        deck = [protocol.encode_card(v, s) for s in suits for v in values]
-        random.shuffle(deck)
+        # Copy the prebuilt deck and shuffle it in place
+        deck = bytearray(BASE_DECK)
+        self._rng.shuffle(deck)
+        deck_view = memoryview(deck)  # Zero-copy per-player slices for the log
         
         self.log_game_event("DEAL_CARDS", f"Hand {self.hand_number} - Shuffled and dealing {len(deck)} cards")
         
+        # One broadcast carries the whole deck; player N keeps cards [N*13, N*13+13)
+        if hand_summary is None:
+            seq = self.network_node.send_message(
+                protocol.DEAL_ALL_HANDS, self.player_id, protocol.BROADCAST_ID, 
+                self.get_next_seq(), deck
+            )
+            self.output_message(f"Sent all {len(deck)} cards in one DEAL_ALL_HANDS", level="DEBUG", source_id="Dealer")
+        else:
+            seq = self.network_node.send_message(
+                protocol.HAND_SUMMARY_AND_DEAL, self.player_id, protocol.BROADCAST_ID, 
+                self.get_next_seq(), hand_summary + deck
+            )
+            self.output_message(f"Sent hand summary and all {len(deck)} cards in one HAND_SUMMARY_AND_DEAL", level="DEBUG", source_id="Dealer")
+        
         # Log all hands being dealt
         hands_dealt = {}
         for player_id in range(4):
             start_idx = player_id * CARDS_PER_HAND
             end_idx = start_idx + CARDS_PER_HAND
-            hand_cards = deck[start_idx:end_idx]
-            hands_dealt[player_id] = [self._format_card_display(c) for c in hand_cards]
-            
-            self.network_node.send_message(
-                protocol.DEAL_HAND, self.player_id, player_id, 
-                self.get_next_seq(), bytes(hand_cards)
-            )
-            self.output_message(f"Sent {len(hand_cards)} cards to Player {player_id}", level="DEBUG", source_id="Dealer")
+            hands_dealt[player_id] = [self._format_card_display(c) for c in deck_view[start_idx:end_idx]]
         
         # Log complete hand distribution
         for player_id, cards in hands_dealt.items():
@@ -325,6 +479,9 @@ class HeartsGame:
         
         self.output_message(f"Created and shuffled deck of {len(deck)} cards", level="DEBUG", source_id="Dealer")
         self.output_message("Dealing cards...", level="DEBUG", source_id="Dealer")
+        
+        # Once the deal is back around the ring, every player has their hand
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
 
     # ============================================================================
     # CARD PASSING PHASE METHODS
@@ -337,22 +494,18 @@ class HeartsGame:
             
         assert self.pass_direction is not None, "Dealer's pass_direction cannot be None"
         
-        direction_name = PASS_DIRECTION_NAMES.get(self.pass_direction, "UNKNOWN")
+        direction_name = PASS_DIRECTION_NAMES[self.pass_direction] if 0 <= self.pass_direction < 4 else "UNKNOWN"
         self.log_game_event("PHASE_START", f"Hand {self.hand_number} - Starting passing phase", 
                           f"Direction: {direction_name}")
         self.output_message(f"Starting pass phase (pass {direction_name})", level="DEBUG", source_id="Dealer")
         self.output_message(f"Pass direction: {direction_name}", level="INFO", source_id="Dealer")
         
         # Send phase start message
-        payload = bytes([protocol.PHASE_PASSING, self.pass_direction])
+        # The dealer's own turn starts from handle_start_phase, after its main loop has applied the deal
         self.network_node.send_message(
             protocol.START_PHASE, self.player_id, protocol.BROADCAST_ID, 
-            self.get_next_seq(), payload
+            self.get_next_seq(), PASSING_PHASE_PAYLOADS[self.pass_direction]
         )
-        
-        # Increased delay for phase transition
-        time.sleep(1.0)
-        self.initiate_card_passing()
 
     def initiate_card_passing(self):
         """Start card passing for the current player."""
@@ -368,8 +521,9 @@ class HeartsGame:
             return
         
         self.display_hand()
-        # Add delay before getting cards from user for UI stability
-        time.sleep(0.3)
+        if not self.auto_mode:
+            # Let the hand render before prompting; input() blocks this thread anyway
+            time.sleep(0.3)
         self._get_cards_to_pass_from_user()
 
     def _get_cards_to_pass_from_user(self):
@@ -394,7 +548,7 @@ class HeartsGame:
         
         while True:
             try:
-                ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                ts = format_timestamp(time.time())
                 prompt = f"[{ts}] Player {self.player_id}: Select 3 cards to pass (e.g., 0 1 2): "
                 
                 user_input = timeout_input.input_with_timeout(prompt)
@@ -418,7 +572,7 @@ class HeartsGame:
                 if len(indices_str) != CARDS_TO_PASS:
                     raise ValueError(f"Must select exactly {CARDS_TO_PASS} cards.")
                 
-                indices = [int(i) for i in indices_str]
+                indices = list(map(int, indices_str))  # int() rejects non-numbers with ValueError
                 
                 if len(set(indices)) != CARDS_TO_PASS:
                     raise ValueError("Must select 3 distinct cards.")
@@ -426,7 +580,7 @@ class HeartsGame:
                 if any(not (0 <= i < len(self.hand)) for i in indices):
                     raise ValueError("Card index out of range.")
                 
-                self.cards_to_pass = [self.hand[i] for i in indices]
+                self.cards_to_pass = bytes(self.hand[i] for i in indices)  # Same type as the auto-select paths
                 cards_str = [self._format_card_display(c) for c in self.cards_to_pass]
                 self.log_game_event("MANUAL_PASS", f"Player {self.player_id} manually selected cards to pass: {' '.join(cards_str)}")
                 break
@@ -454,19 +608,17 @@ class HeartsGame:
         if target_id is None:
             return
         
-        # Remove cards from hand
-        for card in self.cards_to_pass:
-            if card in self.hand:
-                self.hand.remove(card)
+        # Remove cards from hand (cards not held are simply ignored)
+        self._set_hand_mask(self.hand_mask & ~_mask_from_cards(self.cards_to_pass))
         
         # Send pass cards message
-        self.network_node.send_message(
+        seq = self.network_node.send_message(
             protocol.PASS_CARDS, self.player_id, target_id, 
             self.get_next_seq(), bytes(self.cards_to_pass)
         )
         
-        # Add delay after sending cards for network reliability
-        time.sleep(0.5)
+        # Make sure the cards reached the target before handing on the token
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
         
         # Log the card passing event
         try:
@@ -480,9 +632,7 @@ class HeartsGame:
         self.output_message(f"Passed 3 cards to Player {target_id}", level="INFO")
         self.cards_passed = True
         
-        # Add delay before token passing
-        time.sleep(0.3)
-        self.pass_token_to_player((self.player_id + 1) % 4)
+        self.pass_token_to_player((self.player_id + 1) & 3)
 
     # ============================================================================
     # TRICKS PHASE METHODS
@@ -501,13 +651,13 @@ class HeartsGame:
         self.cards_to_pass = []
         
         # Send phase start message
-        self.network_node.send_message(
+        seq = self.network_node.send_message(
             protocol.START_PHASE, self.player_id, protocol.BROADCAST_ID, 
-            self.get_next_seq(), bytes([protocol.PHASE_TRICKS])
+            self.get_next_seq(), TRICKS_PHASE_PAYLOAD
         )
         
-        # Increased delay for phase transition
-        time.sleep(0.8)
+        # Wait for the phase change to reach every player
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
         
         # FIXED: Always start by passing token to Player 0 and let it circulate
         # systematically until it reaches the player with 2♣
@@ -517,7 +667,6 @@ class HeartsGame:
         
         # Clear dealer's token state and start circulation from Player 0
         self.has_token = False
-        time.sleep(0.3)
         self.pass_token_to_player(0)
 
     def initiate_card_play(self):
@@ -528,17 +677,19 @@ class HeartsGame:
             
         self.output_message(f"--- Your Turn (Player {self.player_id}) to Play ---", level="INFO", timestamp=False)
         
+        # One pass over the masks decides both the forced 2♣ lead and the valid plays
+        valid_mask = self._get_valid_play_mask()
+        
         # Handle mandatory 2 of clubs play
-        two_clubs = protocol.encode_card("2", "CLUBS")
-        if self.is_first_trick and len(self.current_trick) == 0 and two_clubs in self.hand:
+        if valid_mask == 1 << TWO_OF_CLUBS and not self.trick_cards:
             self.output_message("Must play 2♣ to start first trick", level="INFO")
-            self.play_card(two_clubs)
+            self.play_card(TWO_OF_CLUBS)
             return
         
         self.display_hand()
         self._display_current_trick()
         
-        valid_cards = self.get_valid_plays()
+        valid_cards = self.hand if valid_mask == self.hand_mask else _cards_from_mask(valid_mask)
         if not valid_cards:
             self.output_message("Error: No valid cards found. Playing first card.", level="INFO")
             if self.hand:
@@ -550,14 +701,12 @@ class HeartsGame:
 
     def _display_current_trick(self):
         """Display the cards already played in the current trick."""
-        if self.current_trick:
+        if self.trick_cards:
             self.output_message("Current trick:", level="INFO")
-            for player_id, card_byte in self.current_trick:
-                try:
-                    card_display = self._format_card_display(card_byte)
-                    self.output_message(f"  Player {player_id}: {card_display}", level="INFO", timestamp=False)
-                except:
-                    self.output_message(f"  Player {player_id}: ? ({card_byte:02x})", level="DEBUG", timestamp=False)
+            self.output_message("\n".join(
+                f"  Player {player_id}: {self._format_card_display(card_byte)}"
+                for player_id, card_byte in zip(self.trick_pids, self.trick_cards)
+            ), level="INFO", timestamp=False)
         else:
             self.output_message("You are leading the trick.", level="INFO")
 
@@ -592,7 +741,7 @@ class HeartsGame:
         
         while True:
             try:
-                ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                ts = format_timestamp(time.time())
                 prompt = f"[{ts}] Player {self.player_id}: Select a card to play (enter index): "
                 
                 user_input = timeout_input.input_with_timeout(prompt)
@@ -621,30 +770,26 @@ class HeartsGame:
                 if selected_card not in valid_cards:
                     # Provide detailed error message about why the card is invalid
                     card_display = self._format_card_display(selected_card)
-                    if self.current_trick:
-                        try:
-                            _, lead_suit = protocol.decode_card(self.current_trick[0][1])
-                            _, selected_suit = protocol.decode_card(selected_card)
-                            
-                            # Check if player has cards of lead suit
-                            has_lead_suit = any(
-                                protocol.decode_card(c)[1] == lead_suit 
-                                for c in self.hand 
-                                if c != selected_card  # Don't count the selected card
-                            )
-                            
-                            if has_lead_suit and selected_suit != lead_suit:
-                                self.output_message(f"INVALID: {card_display} - You must follow suit ({lead_suit}) when you have {lead_suit} cards!", level="INFO")
-                                # Show what cards they should play instead
-                                valid_displays = [self._format_card_display(c) for c in valid_cards]
-                                self.output_message(f"Valid cards: {', '.join(valid_displays)}", level="INFO")
-                                continue
-                            else:
-                                self.output_message(f"INVALID: {card_display} - This card violates Hearts rules", level="INFO")
-                                continue
-                        except Exception as e:
+                    if self.trick_cards:
+                        lead_info = CARD_TABLE[self.trick_cards[0]]
+                        selected_info = CARD_TABLE[selected_card]
+                        if lead_info is None or selected_info is None:
                             self.output_message(f"INVALID: {card_display} - Not a valid play", level="INFO")
                             continue
+                        
+                        lead_suit = lead_info.suit
+                        # Check if player has cards of lead suit (not counting the selected card)
+                        has_lead_suit = self.hand_mask & SUIT_MASKS[lead_info.suit_id] & ~(1 << selected_card)
+                        
+                        if has_lead_suit and selected_info.suit != lead_suit:
+                            self.output_message(f"INVALID: {card_display} - You must follow suit ({lead_suit}) when you have {lead_suit} cards!", level="INFO")
+                            # Show what cards they should play instead
+                            valid_displays = [self._format_card_display(c) for c in valid_cards]
+                            self.output_message(f"Valid cards: {', '.join(valid_displays)}", level="INFO")
+                            continue
+                        else:
+                            self.output_message(f"INVALID: {card_display} - This card violates Hearts rules", level="INFO")
+                            continue
                     else:
                         self.output_message(f"INVALID: {card_display} - Cannot lead with this card", level="INFO")
                         continue
@@ -666,148 +811,55 @@ class HeartsGame:
                 return
 
     def get_valid_plays(self):
-        """Get list of valid cards that can be played according to Hearts rules."""
-        if not self.hand:
-            return []
-        
-        try:
-            two_of_clubs = protocol.encode_card("2", "CLUBS")
-        except Exception as e:
-            self.output_message(f"Error encoding 2 of clubs: {e}", level="DEBUG")
-            return list(self.hand)  # Fallback: return all cards
-        
-        # First trick special rules
-        if self.is_first_trick:
-            return self._get_first_trick_valid_plays(two_of_clubs)
-        
-        # Regular trick rules
-        if self.current_trick:
-            return self._get_following_valid_plays()
-        else:
-            return self._get_leading_valid_plays()
-
-    def _get_first_trick_valid_plays(self, two_of_clubs):
-        """Get valid plays for the first trick."""
-        # Must lead with 2 of clubs if available
-        if two_of_clubs in self.hand and not self.current_trick:
-            return [two_of_clubs]
-        
-        # Following in first trick
-        if self.current_trick:
-            try:
-                _, lead_suit = protocol.decode_card(self.current_trick[0][1])
-                cards_in_suit = []
-                for c in self.hand:
-                    try:
-                        _, suit = protocol.decode_card(c)
-                        if suit == lead_suit:
-                            cards_in_suit.append(c)
-                    except Exception as e:
-                        self.output_message(f"Error decoding card in hand: {e}", level="DEBUG")
-                        continue
-                
-                if cards_in_suit:
-                    return cards_in_suit
-                
-                # Can't play points in first trick
-                non_point_cards = []
-                for c in self.hand:
-                    try:
-                        value, suit = protocol.decode_card(c)
-                        is_heart = (suit == "HEARTS")
-                        is_queen_spades = (value == "Q" and suit == "SPADES")
-                        if not (is_heart or is_queen_spades):
-                            non_point_cards.append(c)
-                    except Exception as e:
-                        self.output_message(f"Error decoding card for points check: {e}", level="DEBUG")
-                        # If we can't decode it, assume it's not a point card
-                        non_point_cards.append(c)
-                
-                return non_point_cards if non_point_cards else list(self.hand)
-            except Exception as e:
-                self.output_message(f"Error in first trick following logic: {e}", level="DEBUG")
-                return list(self.hand)
-        
-        # Leading first trick (not with 2♣)
-        non_point_cards = []
-        for c in self.hand:
-            try:
-                value, suit = protocol.decode_card(c)
-                is_heart = (suit == "HEARTS")
-                is_queen_spades = (value == "Q" and suit == "SPADES")
-                if not (is_heart or is_queen_spades):
-                    non_point_cards.append(c)
-            except Exception as e:
-                self.output_message(f"Error decoding card for leading first trick: {e}", level="DEBUG")
-                # If we can't decode it, assume it's not a point card
-                non_point_cards.append(c)
-        
-        return non_point_cards if non_point_cards else list(self.hand)
-
-    def _get_following_valid_plays(self):
-        """Get valid plays when following suit."""
-        if not self.current_trick:
-            # This shouldn't happen, but if it does, treat as leading
-            return self._get_leading_valid_plays()
-        
-        try:
-            _, lead_suit = protocol.decode_card(self.current_trick[0][1])
-        except Exception as e:
-            self.output_message(f"CRITICAL ERROR: Cannot decode lead card: {e}", level="INFO")
-            # This is a critical error - we cannot continue without knowing the lead suit
-            # Return empty list to force error handling at higher level
-            return []
-        
-        cards_in_suit = []
-        
-        # Check each card in hand for the lead suit
-        for card in self.hand:
-            try:
-                _, suit = protocol.decode_card(card)
-                if suit == lead_suit:
-                    cards_in_suit.append(card)
-            except Exception as e:
-                # If we can't decode a card, we can't know its suit, so we can't allow it
-                self.output_message(f"Warning: Cannot decode card in hand: {e}", level="DEBUG")
-                continue
-        
-        # STRICT SUIT FOLLOWING ENFORCEMENT
-        if cards_in_suit:
-            # Player has cards of the lead suit - MUST play one of them
+        """Get the valid cards that can be played according to Hearts rules.
+
+        Returns sorted card bytes; the result may be self.hand itself, so callers must treat it as read-only.
+        """
+        valid_mask = self._get_valid_play_mask()
+        return self.hand if valid_mask == self.hand_mask else _cards_from_mask(valid_mask)
+
+    def _get_valid_play_mask(self):
+        """Compute the bitmask of valid plays in one pass over the hand/suit masks."""
+        hand_mask = self.hand_mask
+        if not hand_mask:
+            return 0
+        
+        if self.trick_cards:
+            # Following: must follow the lead suit when possible
+            lead_suit = SUIT_BY_BYTE[self.trick_cards[0]]
+            if lead_suit == 0xFF:
+                self.output_message(f"CRITICAL ERROR: Cannot decode lead card {self.trick_cards[0]:02x}", level="INFO")
+                # This is a critical error - we cannot continue without knowing the lead suit
+                # Return no cards to force error handling at higher level
+                return 0
+            
+            cards_in_suit = hand_mask & SUIT_MASKS[lead_suit]
+            if cards_in_suit:
+                if self.verbose_mode:
+                    lead_suit_cards = [self._format_card_display(c) for c in _cards_from_mask(cards_in_suit)]
+                    self.output_message(f"ENFORCING suit following ({protocol.SUIT_NAMES[lead_suit]}): {' '.join(lead_suit_cards)}", level="DEBUG")
+                return cards_in_suit
+            
             if self.verbose_mode:
-                lead_suit_cards = [self._format_card_display(c) for c in cards_in_suit]
-                self.output_message(f"ENFORCING suit following ({lead_suit}): {' '.join(lead_suit_cards)}", level="DEBUG")
-            return cards_in_suit
-        
-        # Player has no cards of the lead suit - may play any card they can decode
-        playable_cards = []
-        for card in self.hand:
-            try:
-                protocol.decode_card(card)  # Just check if it's decodable
-                playable_cards.append(card)
-            except Exception:
-                # Skip cards we can't decode
-                continue
-        
-        if self.verbose_mode:
-            self.output_message(f"No {lead_suit} cards - may play any card", level="DEBUG")
-        
-        return playable_cards if playable_cards else list(self.hand)  # Emergency fallback
-        
-
-    def _get_leading_valid_plays(self):
-        """Get valid plays when leading a trick."""
-        # Can't lead with hearts until broken
-        if not self.hearts_broken:
-            non_hearts = [c for c in self.hand if protocol.decode_card(c)[1] != "HEARTS"]
-            if non_hearts:
-                return non_hearts
+                self.output_message(f"No {protocol.SUIT_NAMES[lead_suit]} cards - may play any card", level="DEBUG")
+        elif self.is_first_trick:
+            # Must lead with 2 of clubs if available
+            if (hand_mask >> TWO_OF_CLUBS) & 1:
+                return 1 << TWO_OF_CLUBS
+        elif not self.hearts_broken:
+            # Can't lead with hearts until broken
+            return (hand_mask & ~HEARTS_MASK) or hand_mask
+        else:
+            return hand_mask
         
-        return list(self.hand)
+        # Can't play points in first trick (following off-suit, or leading without 2♣)
+        if self.is_first_trick:
+            return (hand_mask & ~POINT_CARDS_MASK) or hand_mask
+        return hand_mask
 
     def play_card(self, card_byte):
         """Play a card and broadcast it to all players."""
-        if card_byte not in self.hand or not self.network_node:
+        if not (self.hand_mask >> card_byte) & 1 or not self.network_node:
             return
         
         # CRITICAL CHECK: Prevent playing multiple cards in the same trick
@@ -815,23 +867,22 @@ class HeartsGame:
             self.output_message("Error: You have already played a card in this trick!", level="INFO")
             return
         
-        self.hand.remove(card_byte)
-        self.network_node.send_message(
+        self._set_hand_mask(self.hand_mask ^ (1 << card_byte))
+        seq = self.network_node.send_message(
             protocol.PLAY_CARD, self.player_id, protocol.BROADCAST_ID, 
-            self.get_next_seq(), bytes([card_byte])
+            self.get_next_seq(), PLAY_CARD_PAYLOADS[card_byte]
         )
         
-        # Add delay after playing card for network reliability
-        time.sleep(0.3)
+        # Wait for the play to reach every player
+        self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
         
-        value, suit = protocol.decode_card(card_byte)
-        card_display = self._format_card_display(card_byte)
-        self.output_message(f"Played {card_display}", level="INFO")
+        info = CARD_TABLE[card_byte]
+        self.output_message(f"Played {info.value}{info.symbol}", level="INFO")
         
         # Note: Card play logging is done in handle_play_card when message is received
         # to avoid duplicate logging since all players receive the same message
         
-        if suit == "HEARTS":
+        if IS_HEARTS_BY_BYTE[card_byte]:
             self.hearts_broken = True
         
         # Mark that the player has played a card in this trick
@@ -843,106 +894,90 @@ class HeartsGame:
 
     def calculate_trick_winner(self):
         """Calculate the winner of the current trick (dealer only)."""
-        if not self.is_dealer or len(self.current_trick) != 4:
+        if not self.is_dealer or len(self.trick_cards) != 4:
             return
             
         self.output_message("Calculating trick winner...", level="DEBUG", source_id="Dealer")
         
-        # Find highest card of lead suit
-        _, lead_suit = protocol.decode_card(self.current_trick[0][1])
-        winner_idx = 0
-        highest_value = 0
-        
-        for i, (player_id, card_byte) in enumerate(self.current_trick):
-            value, suit = protocol.decode_card(card_byte)
-            card_value = protocol.VALUES[value]
-            
-            if suit == lead_suit and card_value > highest_value:
-                highest_value = card_value
-                winner_idx = i
-        
-        winner_player = self.current_trick[winner_idx][0]
+        # Find highest card of lead suit (off-suit cards rank 0 and can't win)
+        trick_cards = self.trick_cards
+        lead_suit = SUIT_BY_BYTE[trick_cards[0]]
+        winner_idx = max(
+            range(4),
+            key=lambda i: RANK_BY_BYTE[trick_cards[i]] if SUIT_BY_BYTE[trick_cards[i]] == lead_suit else 0
+        )
+        winner_player = self.trick_pids[winner_idx]
         self.trick_winner = winner_player
         
         # Calculate points in this trick
         trick_points = self._calculate_trick_points()
         
         # Log complete trick details - use current trick number (before increment)
-        trick_cards = []
-        for player_id, card_byte in self.current_trick:
+        trick_log = []
+        for player_id, card_byte in zip(self.trick_pids, self.trick_cards):
             card_display = self._format_card_display(card_byte)
-            trick_cards.append(f"Player {player_id}: {card_display}")
+            trick_log.append(f"Player {player_id}: {card_display}")
         
         # Display trick number consistently with other players (current trick, not next)
         current_trick_display = self.trick_count + 1
         self.log_game_event("TRICK_WINNER", 
                           f"Trick {current_trick_display} won by Player {winner_player} ({trick_points} points)",
-                          f"Cards: {', '.join(trick_cards)}")
+                          f"Cards: {', '.join(trick_log)}")
         
-        self.output_message(f"Player {winner_player} wins trick {current_trick_display} with {trick_points} points.", level="DEBUG", source_id="Dealer")
+        if self.verbose_mode:
+            self.output_message(f"Player {winner_player} wins trick {current_trick_display} with {trick_points} points.", level="DEBUG", source_id="Dealer")
         self.trick_points_won[winner_player] += trick_points
         
-        # Send trick summary BEFORE updating trick count
-        self._send_trick_summary(winner_player, trick_points, current_trick_display)
-        
-        # CRITICAL: Give time for trick summary to be processed by all players
-        time.sleep(0.5)
+        # Send trick summary BEFORE updating trick count (returns once every player has it);
+        # unless the hand is over, the token goes to the winner in the same datagram
+        hand_over = current_trick_display >= MAX_TRICKS_PER_HAND
+        self._send_trick_summary(winner_player, trick_points, pass_token=not hand_over)
         
         # Reset for next trick - NOW increment trick count
-        self.current_trick = []
+        self.trick_pids = bytearray()
+        self.trick_cards = bytearray()
         self.trick_count += 1  # Moved AFTER trick summary is sent
         self.is_first_trick = False
         # CRITICAL RESET: Allow all players to play cards in the next trick
         self.played_card_this_trick = False
         
-        if self.trick_count < MAX_TRICKS_PER_HAND:
-            time.sleep(0.5)
-            self.pass_token_to_player(winner_player)
-        else:
+        if hand_over:
             self.output_message("Hand complete!", level="DEBUG", source_id="Dealer")
-            time.sleep(2)
             self.calculate_hand_summary()
 
     def _calculate_trick_points(self):
-        """Calculate points in the current trick."""
-        trick_points = 0
-        
-        for _, card_byte in self.current_trick:
-            value, suit = protocol.decode_card(card_byte)
-            
-            # Hearts are worth 1 point each
-            if suit == "HEARTS":
-                trick_points += 1
-            
-            # Queen of spades is worth 13 points
-            elif value == "Q" and suit == "SPADES":
-                trick_points += 13
-        
-        return trick_points
-
-    def _send_trick_summary(self, winner_player, trick_points, current_trick_display):
-        """Send trick summary to all players."""
-        payload_data = [winner_player]
-        
-        for player_id, card in self.current_trick:
-            payload_data.extend([player_id, card])
-        
-        payload_data.append(trick_points)
-        
-        self.network_node.send_message(
-            protocol.TRICK_SUMMARY, self.player_id, protocol.BROADCAST_ID, 
-            self.get_next_seq(), bytes(payload_data)
-        )
+        """Calculate points in the current trick (hearts 1 each, Q♠ 13)."""
+        return sum(POINTS_BY_BYTE[card_byte] for card_byte in self.trick_cards)
+
+    def _send_trick_summary(self, winner_player, trick_points, pass_token):
+        """Send trick summary to all players; with pass_token, the winner's token rides in the same datagram."""
+        # Layout of TRICK_SUMMARY_STRUCT: winner, 4 x (player, card), points
+        payload = bytearray(protocol.TRICK_SUMMARY_STRUCT.size)
+        payload[0] = winner_player
+        payload[1:9:2] = self.trick_pids
+        payload[2:9:2] = self.trick_cards
+        payload[9] = trick_points
+        
+        summary = (protocol.TRICK_SUMMARY, self.player_id, protocol.BROADCAST_ID, self.get_next_seq(), payload)
+        if not pass_token:
+            seq = self.network_node.send_message(*summary)
+            self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
+            return
         
-        # Add delay after trick summary for network reliability
-        time.sleep(0.4)
+        # Every node queues the summary before the token, so the winner leads with a cleared trick
+        self.has_token = False
+        token = (protocol.TOKEN_PASS, self.player_id, winner_player, self.get_next_seq(), b"")
+        if self.verbose_mode:
+            self.output_message(f"Passed token to Player {winner_player}", level="DEBUG", source_id="Dealer")
+        for seq in self.network_node.send_batch([summary, token]):
+            self.network_node.wait_ring_return(seq, RING_RETURN_TIMEOUT)
 
     def calculate_hand_summary(self):
         """Calculate and send hand summary with scores (dealer only)."""
         if not self.is_dealer:
             return
             
-        self.output_message("="*60 + f"\n📊 HAND {self.hand_number} SUMMARY\n" + "="*60, 
+        self.output_message(f"{BANNER}\n📊 HAND {self.hand_number} SUMMARY\n{BANNER}", 
                           level="INFO", source_id="Dealer", timestamp=False)
         
         # Log hand scoring details
@@ -952,30 +987,40 @@ class HeartsGame:
         
         # Check for shooting the moon
         shoot_moon_player_id = self._check_shoot_moon()
+        if shoot_moon_player_id == self.player_id and not self.auto_mode:
+            # The dealer's scoring prompt runs on the scheduler thread so the message loop keeps draining
+            self._schedule(0, self._finish_hand_summary, shoot_moon_player_id)
+        else:
+            self._finish_hand_summary(shoot_moon_player_id)
+
+    def _finish_hand_summary(self, shoot_moon_player_id):
+        """Score the hand, then send the summary with the next deal or end the game (dealer only)."""
         shoot_moon_payload = 0xFF
         
         if shoot_moon_player_id is not None:
             shoot_moon_payload = self._handle_shoot_moon(shoot_moon_player_id)
         else:
-            self.hand_scores = self.trick_points_won.copy()
+            self.hand_scores[:] = self.trick_points_won
         
         # Update total scores
-        for player_id in range(4):
-            self.total_scores[player_id] += self.hand_scores[player_id]
+        total_scores = self.total_scores
+        for player_id, points in enumerate(self.hand_scores):
+            total_scores[player_id] += points
         
         # Log final scores
         self.log_game_event("TOTAL_SCORES", f"Hand {self.hand_number} totals: " + 
-                          ", ".join([f"P{i}:{self.total_scores[i]}" for i in range(4)]))
+                          ", ".join([f"P{i}:{score}" for i, score in enumerate(total_scores)]))
         
         self._display_hand_scores()
-        self._send_hand_summary(shoot_moon_payload)
-        
-        time.sleep(2)
+        hand_summary = protocol.HAND_SUMMARY_STRUCT.pack(*self.hand_scores, *self.total_scores, shoot_moon_payload)
         
         if max(self.total_scores) >= GAME_END_SCORE:
-            self.calculate_game_over()
+            self._send_hand_summary(hand_summary)
+            # Scheduled so the message loop keeps draining while the summary goes around
+            self._schedule(0.5, self.calculate_game_over)
         else:
-            self.start_next_hand()
+            # The summary travels with the next hand's deal in a single datagram
+            self.start_next_hand(hand_summary)
 
     def _check_shoot_moon(self):
         """Check if any player shot the moon."""
@@ -993,18 +1038,22 @@ class HeartsGame:
             return self._get_shoot_moon_choice(shoot_moon_player_id)
         else:
             self.output_message(f"🌙 Player {shoot_moon_player_id} SHOT THE MOON!", level="INFO", source_id="Dealer")
-            self.hand_scores = [SHOOT_MOON_POINTS] * 4
-            self.hand_scores[shoot_moon_player_id] = 0
+            self._set_shoot_moon_scores(shoot_moon_player_id)
             self.log_game_event("SHOOT_MOON_SCORING", 
                               f"Applied shooting moon: Player {shoot_moon_player_id} gets 0, others get 26")
             return shoot_moon_player_id
 
+    def _set_shoot_moon_scores(self, shoot_moon_player_id, subtract=False):
+        """Fill hand_scores in place: 26 to everyone else, or (subtract) -26 to the shooter only."""
+        others, shooter = (0, -SHOOT_MOON_POINTS) if subtract else (SHOOT_MOON_POINTS, 0)
+        self.hand_scores[:] = array.array("i", [others] * 4)
+        self.hand_scores[shoot_moon_player_id] = shooter
+
     def _get_shoot_moon_choice(self, shoot_moon_player_id):
         """Handle shoot the moon choice for the dealer when they shot the moon."""
         if self.auto_mode:
             # Auto mode: choose to subtract 26 from others
-            self.hand_scores = [SHOOT_MOON_POINTS] * 4
-            self.hand_scores[shoot_moon_player_id] = 0
+            self._set_shoot_moon_scores(shoot_moon_player_id)
             self.log_game_event("SHOOT_MOON_SCORING", 
                               f"Auto-mode: Player {shoot_moon_player_id} gets 0, others get 26")
             return shoot_moon_player_id
@@ -1018,15 +1067,14 @@ class HeartsGame:
                 self.output_message("  [1] Give 26 points to all other players (recommended)", level="INFO", timestamp=False)
                 self.output_message("  [2] Subtract 26 points from your total", level="INFO", timestamp=False)
                 
-                ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                ts = format_timestamp(time.time())
                 prompt = f"[{ts}] Enter choice (1 or 2): "
                 
                 user_input = timeout_input.input_with_timeout(prompt)
                 if user_input is None:
                     # Timeout - choose option 1 (safer choice)
                     self.output_message("Input timeout - choosing option 1 (give points to others)", level="INFO")
-                    self.hand_scores = [SHOOT_MOON_POINTS] * 4
-                    self.hand_scores[shoot_moon_player_id] = 0
+                    self._set_shoot_moon_scores(shoot_moon_player_id)
                     self.log_game_event("SHOOT_MOON_SCORING", 
                                       f"Timeout choice: Player {shoot_moon_player_id} gets 0, others get 26")
                     return shoot_moon_player_id
@@ -1035,16 +1083,14 @@ class HeartsGame:
                 
                 if choice == 1:
                     # Give 26 points to all other players
-                    self.hand_scores = [SHOOT_MOON_POINTS] * 4
-                    self.hand_scores[shoot_moon_player_id] = 0
+                    self._set_shoot_moon_scores(shoot_moon_player_id)
                     self.output_message("Chose to give 26 points to all other players", level="INFO")
                     self.log_game_event("SHOOT_MOON_SCORING", 
                                       f"Manual choice 1: Player {shoot_moon_player_id} gets 0, others get 26")
                     return shoot_moon_player_id
                 elif choice == 2:
                     # Subtract 26 points from shooter's total
-                    self.hand_scores = [0, 0, 0, 0]
-                    self.hand_scores[shoot_moon_player_id] = -SHOOT_MOON_POINTS
+                    self._set_shoot_moon_scores(shoot_moon_player_id, subtract=True)
                     self.output_message("Chose to subtract 26 points from your total", level="INFO")
                     self.log_game_event("SHOOT_MOON_SCORING", 
                                       f"Manual choice 2: Player {shoot_moon_player_id} gets -26, others get 0")
@@ -1056,8 +1102,7 @@ class HeartsGame:
                 self.output_message(f"Invalid choice: {e}. Please try again.", level="INFO")
             except Exception as e:
                 self.output_message(f"Input error: {e}. Choosing option 1.", level="INFO")
-                self.hand_scores = [SHOOT_MOON_POINTS] * 4
-                self.hand_scores[shoot_moon_player_id] = 0
+                self._set_shoot_moon_scores(shoot_moon_player_id)
                 self.log_game_event("SHOOT_MOON_SCORING", 
                                   f"Exception fallback: Player {shoot_moon_player_id} gets 0, others get 26")
                 return shoot_moon_player_id
@@ -1065,16 +1110,13 @@ class HeartsGame:
     def _display_hand_scores(self):
         """Display the scores for this hand and total scores."""
         self.output_message("Hand Points:", level="INFO", source_id="Dealer")
-        for player_id, score in enumerate(self.hand_scores):
-            self.output_message(f"  Player {player_id}: {score} points", level="INFO", timestamp=False)
+        self.output_message(_score_lines(self.hand_scores), level="INFO", timestamp=False)
         
         self.output_message("\nTotal Scores:", level="INFO", source_id="Dealer", timestamp=False)
-        for player_id, score in enumerate(self.total_scores):
-            self.output_message(f"  Player {player_id}: {score} points", level="INFO", timestamp=False)
+        self.output_message(_score_lines(self.total_scores), level="INFO", timestamp=False)
 
-    def _send_hand_summary(self, shoot_moon_payload):
-        """Send hand summary message to all players."""
-        payload = bytes(self.hand_scores + self.total_scores + [shoot_moon_payload])
+    def _send_hand_summary(self, payload):
+        """Send a packed hand summary message to all players."""
         self.network_node.send_message(
             protocol.HAND_SUMMARY, self.player_id, protocol.BROADCAST_ID, 
             self.get_next_seq(), payload
@@ -1086,7 +1128,7 @@ class HeartsGame:
         if not self.is_dealer:
             return
             
-        self.output_message("="*60 + "\n🎯 GAME OVER!\n" + "="*60, 
+        self.output_message(GAME_OVER_HEADER, 
                           level="INFO", source_id="Dealer", timestamp=False)
         
         min_score = min(self.total_scores)
@@ -1098,19 +1140,17 @@ class HeartsGame:
         self.log_game_event("FINAL_SCORES", final_scores_str)
         
         self.output_message("Final Scores:", level="INFO", source_id="Dealer")
-        for player_id, score in enumerate(self.total_scores):
-            status = " 🏆 WINNER!" if player_id == winner_id else ""
-            self.output_message(f"  Player {player_id}: {score} points{status}", level="INFO", timestamp=False)
+        self.output_message(_score_lines(self.total_scores, winner_id), level="INFO", timestamp=False)
         
         self.output_message(f"🎉 Player {winner_id} wins with {min_score} points!", level="INFO", source_id="Dealer")
         
-        payload = bytes([winner_id] + self.total_scores)
+        payload = protocol.GAME_OVER_STRUCT.pack(winner_id, *self.total_scores)
         self.network_node.send_message(
             protocol.GAME_OVER, self.player_id, protocol.BROADCAST_ID, 
             self.get_next_seq(), payload
         )
         self.output_message("Sent GAME_OVER", level="DEBUG", source_id="Dealer")
-        self.game_over = True
+        self.stop()
         
         # Close log file
         if self.log_file:
@@ -1119,8 +1159,8 @@ class HeartsGame:
             self.log_file.close()
             self.output_message("Game log file closed", level="INFO", source_id="Dealer")
 
-    def start_next_hand(self):
-        """Start the next hand (dealer only)."""
+    def start_next_hand(self, hand_summary=None):
+        """Start the next hand (dealer only), delivering hand_summary along with the deal."""
         if not self.is_dealer:
             return
             
@@ -1128,8 +1168,8 @@ class HeartsGame:
         self.trick_count = 0
         self.is_first_trick = True
         self.hearts_broken = False
-        self.trick_points_won = [0, 0, 0, 0]
-        self.pass_cards_received = set()
+        self.trick_points_won[:] = array.array("i", [0, 0, 0, 0])
+        self.pass_cards_received_mask = 0  # Bit N set once player N has passed
         self.passing_complete = False
         self.cards_passed = False
         self.has_token = True
@@ -1137,23 +1177,22 @@ class HeartsGame:
         self.played_card_this_trick = False
         
         # Cycle through pass directions
-        pass_directions = [protocol.PASS_LEFT, protocol.PASS_RIGHT, protocol.PASS_ACROSS, protocol.PASS_NONE]
-        self.pass_direction = pass_directions[(self.hand_number - 1) % 4]
+        self.pass_direction = PASS_CYCLE[(self.hand_number - 1) & 3]
         
         self.output_message(f"Dealer initiating Hand {self.hand_number}", level="DEBUG", source_id="Dealer")
         
-        def delayed_new_hand():
-            time.sleep(3)
-            self.deal_cards()
-            time.sleep(1)
-            
-            if self.pass_direction == protocol.PASS_NONE:
-                self.output_message("No passing this hand", level="DEBUG", source_id="Dealer")
-                self.start_tricks_phase()
-            else:
-                self.start_passing_phase()
+        self.deal_cards(hand_summary)
         
-        threading.Thread(target=delayed_new_hand, daemon=True).start()
+        # Leave players time to read the summary before play resumes
+        self._schedule(5, self._open_hand_phase)
+
+    def _open_hand_phase(self):
+        """Open the passing phase of a freshly dealt hand (or go straight to tricks on a no-pass hand)."""
+        if self.pass_direction == protocol.PASS_NONE:
+            self.output_message("No passing this hand", level="DEBUG", source_id="Dealer")
+            self.start_tricks_phase()
+        else:
+            self.start_passing_phase()
 
     # ============================================================================
     # MESSAGE HANDLERS
@@ -1171,11 +1210,37 @@ class HeartsGame:
         if len(payload) != CARDS_PER_HAND:
             self.output_message(f"Invalid hand size: {len(payload)}", level="DEBUG")
             return
-            
+        
+        self._receive_hand(payload)
+
+    def handle_deal_all_hands(self, header, payload):
+        """Handle DEAL_ALL_HANDS message: keep this player's 13-card slice of the deck."""
+        self.clear_screen()
+        if len(payload) != CARDS_PER_HAND * 4:
+            self.output_message(f"Invalid deck size: {len(payload)}", level="DEBUG")
+            return
+        
+        start_idx = self.player_id * CARDS_PER_HAND
+        self._receive_hand(payload[start_idx:start_idx + CARDS_PER_HAND])
+
+    def handle_hand_summary_and_deal(self, header, payload):
+        """Handle HAND_SUMMARY_AND_DEAL message: show the summary, then keep this player's slice of the deck."""
+        summary_size = protocol.HAND_SUMMARY_STRUCT.size
+        if len(payload) != summary_size + CARDS_PER_HAND * 4:
+            self.output_message(f"Invalid summary and deal size: {len(payload)}", level="DEBUG")
+            return
+        
+        self.handle_hand_summary(header, payload[:summary_size])
+        # No clear_screen here, so the summary stays visible above the new hand
+        start_idx = summary_size + self.player_id * CARDS_PER_HAND
+        self._receive_hand(payload[start_idx:start_idx + CARDS_PER_HAND])
+
+    def _receive_hand(self, cards):
+        """Take a newly dealt hand and reset per-hand state."""
         self.output_message(f"==================== HAND {self.hand_number} ====================", 
                           level="INFO", timestamp=False)
         
-        self.hand = list(payload)
+        self._set_hand_mask(_mask_from_cards(cards))
         self.cards_received = True
         self.output_message(f"Received {len(self.hand)} cards for a new hand", level="INFO")
         self.display_hand()
@@ -1185,11 +1250,12 @@ class HeartsGame:
         self.hearts_broken = False
         # CRITICAL FIX: Reset the played card flag for new hand
         self.played_card_this_trick = False
-        if hasattr(self, '_hearts_broken_announced'):
-            del self._hearts_broken_announced
-        self.current_trick = []
+        self._hearts_broken_announced = False
+        self.trick_pids = bytearray()
+        self.trick_cards = bytearray()
+        self.deferred_plays = []
         
-        if not self.is_dealer and hasattr(self, 'local_trick_display_count'):
+        if not self.is_dealer:
             self.local_trick_display_count = 0
 
     def handle_start_phase(self, header, payload):
@@ -1200,35 +1266,55 @@ class HeartsGame:
             
         phase = payload[0]
         self.current_phase = phase
+        phase_name = PHASE_NAMES[phase] if phase < len(PHASE_NAMES) else "UNKNOWN"
+        self.output_message(f"START_PHASE: {phase_name}", level="DEBUG")
         
-        if phase == protocol.PHASE_PASSING and len(payload) >= 2:
-            self.pass_direction = payload[1]
-            direction_name = PASS_DIRECTION_NAMES.get(self.pass_direction, 'UNKNOWN')
-            self.output_message(f"Passing phase started - direction: {direction_name}", level="INFO")
-        elif phase == protocol.PHASE_TRICKS:
-            self.output_message("Tricks phase started!", level="INFO")
-            self.cards_passed = False
-            self.cards_to_pass = []
+        handler = self.phase_start_handlers.get(phase)
+        if handler:
+            handler(payload)
+
+    def _on_passing_phase_start(self, payload):
+        """START_PHASE(PASSING): record the direction; the dealer takes the first passing turn."""
+        if len(payload) < 2:
+            return
+        
+        self.pass_direction = payload[1]
+        direction_name = PASS_DIRECTION_NAMES[self.pass_direction] if self.pass_direction < 4 else "UNKNOWN"
+        self.output_message(f"Passing phase started - direction: {direction_name}", level="INFO")
+        if self.is_dealer:
+            self.initiate_card_passing()
+
+    def _on_tricks_phase_start(self, payload):
+        """START_PHASE(TRICKS): clear the passing state."""
+        self.output_message("Tricks phase started!", level="INFO")
+        self.cards_passed = False
+        self.cards_to_pass = []
 
     def handle_token_pass(self, header, payload):
         """Handle TOKEN_PASS message."""
-        if len(payload) < 1 or payload[0] != self.player_id:
-            self.has_token = False
+        if header["dest_id"] != self.player_id:
             return
             
         self.has_token = True
         self.output_message("Received token!", level="DEBUG")
         
-        if self.current_phase == protocol.PHASE_PASSING and not self.cards_passed and len(self.hand) >= CARDS_TO_PASS:
+        handler = self.phase_token_handlers.get(self.current_phase)
+        if handler:
+            handler()
+
+    def _on_passing_token(self):
+        """Token received during the passing phase."""
+        if self.is_dealer and self.passing_complete:
+            self.output_message("Token back after passing - starting tricks", level="DEBUG", source_id="Dealer")
+            self.start_tricks_phase()
+        elif not self.cards_passed and len(self.hand) >= CARDS_TO_PASS:
             self._handle_passing_turn()
-        elif self.current_phase == protocol.PHASE_TRICKS:
-            self._handle_tricks_turn()
 
     def _handle_passing_turn(self):
         """Handle token during passing phase."""
         if self.pass_direction == protocol.PASS_NONE:
             self.output_message("No passing this round. Passing token.", level="INFO")
-            self.pass_token_to_player((self.player_id + 1) % 4)
+            self.pass_token_to_player((self.player_id + 1) & 3)
             return
         
         self.output_message(f"--- Your Turn (Player {self.player_id}) to Pass ---", level="INFO", timestamp=False)
@@ -1237,17 +1323,15 @@ class HeartsGame:
 
     def _handle_tricks_turn(self):
         """Handle token during tricks phase."""
-        two_clubs = protocol.encode_card("2", "CLUBS")
-        
-        if self.is_first_trick and len(self.current_trick) == 0:
-            if two_clubs in self.hand:
+        if self.is_first_trick and len(self.trick_cards) == 0:
+            if (self.hand_mask >> TWO_OF_CLUBS) & 1:
                 if not self.is_dealer:
                     self.output_message("I have 2♣! Starting first trick", level="INFO")
                 self.initiate_card_play()
             else:
                 if not self.is_dealer:
                     self.output_message("Don't have 2♣, passing token", level="DEBUG")
-                self.pass_token_to_player((self.player_id + 1) % 4)
+                self.pass_token_to_player((self.player_id + 1) & 3)
         else:
             self.initiate_card_play()
 
@@ -1259,30 +1343,39 @@ class HeartsGame:
         card_byte = payload[0]
         origin_id = header["origin_id"]
         
-        self.current_trick.append((origin_id, card_byte))
+        # A full trick, or a second card from the same player, means this play belongs to the
+        # next trick and overtook the summary: hold it until handle_trick_summary resets the trick
+        if len(self.trick_cards) == 4 or origin_id in self.trick_pids:
+            self.deferred_plays.append((header, payload))
+            self.output_message(f"Deferring PLAY_CARD from Player {origin_id} until the trick summary", level="DEBUG")
+            return
         
-        try:
-            value, suit = protocol.decode_card(card_byte)
-            card_display = self._format_card_display(card_byte)
+        self.trick_pids.append(origin_id)
+        self.trick_cards.append(card_byte)
+        
+        info = CARD_TABLE[card_byte]
+        if info is not None:
+            card_display = CARD_STR[card_byte]
             self.output_message(f"→ Player {origin_id} played {card_display}", level="INFO")
             
             # Log the card play event
             self.log_game_event("CARD_PLAYED", 
-                              f"Player {origin_id} played {card_display} (Trick {self.trick_count + 1}, Position {len(self.current_trick)})")
+                              f"Player {origin_id} played {card_display} (Trick {self.trick_count + 1}, Position {len(self.trick_cards)})")
             
-            if suit == "HEARTS" and not self.hearts_broken:
+            if info.suit == "HEARTS" and not self.hearts_broken:
                 self.hearts_broken = True
                 self.output_message("💔 Hearts have been broken!", level="INFO")
                 self.log_game_event("HEARTS_BROKEN", f"Hearts broken by Player {origin_id} playing {card_display}")
-        except Exception as e:
-            self.output_message(f"→ Player {origin_id} played card (decode error: {e})", level="DEBUG")
+        else:
+            self.output_message(f"→ Player {origin_id} played card (decode error: invalid byte {card_byte:02x})", level="DEBUG")
             self.log_game_event("CARD_PLAYED", f"Player {origin_id} played unknown card (decode error)")
         
-        self.output_message(f"Trick progress: {len(self.current_trick)}/4 cards played", level="DEBUG")
+        if self.verbose_mode:
+            self.output_message(f"Trick progress: {len(self.trick_cards)}/4 cards played", level="DEBUG")
         
-        if len(self.current_trick) < 4:
+        if len(self.trick_cards) < 4:
             if origin_id == self.player_id and self.has_token:
-                self.pass_token_to_player((self.player_id + 1) % 4)
+                self.pass_token_to_player((self.player_id + 1) & 3)
         elif self.is_dealer:
             self.calculate_trick_winner()
 
@@ -1294,9 +1387,6 @@ class HeartsGame:
         winner_id = payload[0]
         trick_points = payload[-1]
         
-        if not hasattr(self, 'local_trick_display_count'):
-            self.local_trick_display_count = 0
-        
         self.local_trick_display_count += 1
         local_count = min(self.local_trick_display_count, MAX_TRICKS_PER_HAND)
         
@@ -1306,67 +1396,65 @@ class HeartsGame:
                           level="INFO")
         
         self.output_message("Cards played this trick:", level="INFO")
-        for i in range(4):
-            player_id = payload[1 + i * 2]
-            card_byte = payload[2 + i * 2]
-            
-            try:
-                card_display = self._format_card_display(card_byte)
-                self.output_message(f"  Player {player_id}: {card_display}", level="INFO", timestamp=False)
-            except:
-                self.output_message(f"  Player {player_id}: [card decode error]", level="DEBUG", timestamp=False)
+        # One write for all four cards (invalid bytes show as ?(xx))
+        self.output_message("\n".join(
+            f"  Player {player_id}: {CARD_STR[card_byte]}"
+            for player_id, card_byte in protocol.PLAYED_CARD_STRUCT.iter_unpack(memoryview(payload)[1:9])
+        ), level="INFO", timestamp=False)
         
         # CRITICAL: Reset trick state for the next trick
-        self.current_trick = []
+        self.trick_pids = bytearray()
+        self.trick_cards = bytearray()
         self.is_first_trick = False
         # CRITICAL RESET: Allow player to play card in the next trick
         self.played_card_this_trick = False
-        self.output_message("="*40, level="INFO", timestamp=False)
+        self.output_message(SHORT_BANNER, level="INFO", timestamp=False)
+        
+        # Replay plays for the new trick that arrived ahead of this summary
+        deferred, self.deferred_plays = self.deferred_plays, []
+        for play_header, play_payload in deferred:
+            self.handle_play_card(play_header, play_payload)
 
     def handle_hand_summary(self, header, payload):
         """Handle HAND_SUMMARY message."""
         self.clear_screen()
-        if len(payload) < 9:
+        if len(payload) < protocol.HAND_SUMMARY_STRUCT.size:
             return
-            
-        hand_points = list(payload[0:4])
-        total_points = list(payload[4:8])
-        shoot_moon_byte = payload[8]
         
-        self.hand_scores = hand_points
-        self.total_scores = total_points
+        summary = protocol.HAND_SUMMARY_STRUCT.unpack_from(payload)
+        hand_points = summary[0:4]
+        total_points = summary[4:8]
+        shoot_moon_byte = summary[8]
+        
+        self.hand_scores[:] = array.array("i", hand_points)
+        self.total_scores[:] = array.array("i", total_points)
         
-        self.output_message("="*60 + "\n📊 HAND SUMMARY (view)\n" + "="*60, 
+        self.output_message(HAND_SUMMARY_VIEW_HEADER, 
                           level="INFO", timestamp=False)
         
         if shoot_moon_byte != 0xFF:
             self.output_message(f"🌙 Player {shoot_moon_byte} SHOT THE MOON!", level="INFO")
         
         self.output_message("Hand Points:", level="INFO")
-        for player_id, score in enumerate(hand_points):
-            self.output_message(f"  Player {player_id}: {score} points", level="INFO", timestamp=False)
+        self.output_message(_score_lines(hand_points), level="INFO", timestamp=False)
         
         self.output_message("Total Scores:", level="INFO")
-        for player_id, score in enumerate(total_points):
-            self.output_message(f"  Player {player_id}: {score} points", level="INFO", timestamp=False)
+        self.output_message(_score_lines(total_points), level="INFO", timestamp=False)
         
-        self.output_message("  " + "="*40, level="INFO", timestamp=False)
+        self.output_message("  " + SHORT_BANNER, level="INFO", timestamp=False)
 
     def handle_game_over(self, header, payload):
         """Handle GAME_OVER message."""
         self.clear_screen()
-        if len(payload) < 5:
+        if len(payload) < protocol.GAME_OVER_STRUCT.size:
             return
             
-        winner_id = payload[0]
-        final_scores = list(payload[1:5])
+        winner_id, *final_scores = protocol.GAME_OVER_STRUCT.unpack_from(payload)
         
-        self.output_message("="*60 + "\n🎯 GAME OVER (results received)\n" + "="*60, 
+        self.output_message(GAME_OVER_VIEW_HEADER, 
                           level="INFO", timestamp=False)
         
-        for player_id, score in enumerate(final_scores):
-            status = " 🏆 WINNER!" if player_id == winner_id else ""
-            self.output_message(f"  Player {player_id}: {score} points{status}", level="INFO", timestamp=False)
+        self.output_message(_score_lines(final_scores, winner_id), level="INFO", timestamp=False)
         
         self.game_over = True
         self.output_message("Game over - final scores received", level="INFO")
@@ -1377,76 +1465,76 @@ class HeartsGame:
             return
             
         # Log card passing event
-        try:
-            passed_cards = [self._format_card_display(c) for c in payload]
-            self.log_game_event("CARDS_PASSED", 
-                              f"Player {header['origin_id']} passed to Player {header['dest_id']}: {' '.join(passed_cards)}")
-        except Exception as e:
-            self.log_game_event("CARDS_PASSED", 
-                              f"Player {header['origin_id']} passed 3 cards to Player {header['dest_id']} (display error)")
+        cards_str = " ".join([CARD_STR[c] for c in payload])
+        self.log_game_event("CARDS_PASSED", 
+                          f"Player {header['origin_id']} passed to Player {header['dest_id']}: {cards_str}")
             
         # If cards are for this player, add them to hand
         if header["dest_id"] == self.player_id:
-            received_cards = list(payload)
-            self.hand.extend(received_cards)
+            self._set_hand_mask(self.hand_mask | _mask_from_cards(payload))
             self.output_message(f"Received 3 cards from Player {header['origin_id']}", level="INFO")
-            
-            try:
-                cards_str = [self._format_card_display(c) for c in received_cards]
-                self.output_message(f"  Received: {' '.join(cards_str)}", level="INFO", timestamp=False)
-            except Exception as e:
-                self.output_message(f"  (Card display error: {e})", level="DEBUG", timestamp=False)
+            self.output_message(f"  Received: {cards_str}", level="INFO", timestamp=False)
             
             self.display_hand()
         
         # Dealer tracks all pass cards messages for synchronization
         if self.is_dealer:
-            if header["origin_id"] not in self.pass_cards_received:
-                self.pass_cards_received.add(header["origin_id"])
-                self.output_message(f"Recorded PASS_CARDS from Player {header['origin_id']} ({len(self.pass_cards_received)}/4)", 
+            bit = 1 << header["origin_id"]
+            if not self.pass_cards_received_mask & bit:
+                self.pass_cards_received_mask |= bit
+                self.output_message(f"Recorded PASS_CARDS from Player {header['origin_id']} ({bin(self.pass_cards_received_mask).count('1')}/4)", 
                                   level="DEBUG", source_id="Dealer")
                 
-                if len(self.pass_cards_received) >= 4:
+                if self.pass_cards_received_mask == 0b1111:
+                    # Tricks start when the last passer hands the token back (see handle_token_pass),
+                    # so that token can't end up circulating alongside the 2♣ search token
                     self.log_game_event("PASSING_COMPLETE", f"All 4 players have passed cards")
-                    self.output_message("All players passed - starting tricks", level="DEBUG", source_id="Dealer")
-                    time.sleep(1)
-                    self.start_tricks_phase()
+                    self.output_message("All players passed - waiting for the token", level="DEBUG", source_id="Dealer")
+                    self.passing_complete = True
 
     # ============================================================================
     # MAIN GAME LOOP
     # ============================================================================
 
+    def stop(self):
+        """Ask the message loop to exit; safe to call from any thread."""
+        self.game_over = True
+        self.message_queue.put(None)  # Wakes the blocking get in process_messages
+
     def process_messages(self):
         """Main message processing loop with timeout monitoring."""
         self.output_message("Ready and waiting for messages...", level="DEBUG")
         
         if self.is_dealer:
-            threading.Thread(target=lambda: (time.sleep(2), self.start_game()), daemon=True).start()
+            self._schedule(2, self.start_game)
         
         # Timeout monitoring variables
         last_activity = time.time()
         last_token_time = time.time() if self.has_token else None
         no_activity_warned = False
+        get_handler = self.message_handlers.get  # Bound once; the table never changes after __init__
+        type_names = protocol.MESSAGE_TYPE_NAMES
         
         try:
             while not self.game_over:
+                current_time = time.time()
+                
+                # Update token timing
+                if self.has_token:
+                    if not last_token_time:
+                        last_token_time = current_time
+                else:
+                    last_token_time = None
+                
+                # Block until a message arrives or the nearest housekeeping deadline is due
+                deadline = last_activity + GAME_TIMEOUT
+                if not no_activity_warned:
+                    deadline = min(deadline, last_activity + NO_ACTIVITY_WARNING)
+                if last_token_time:
+                    deadline = min(deadline, last_token_time + TOKEN_TIMEOUT)
+                
                 try:
-                    header, payload, _ = self.message_queue.get(timeout=1.0)
-                    msg_type = header["type"]
-                    origin_id = header["origin_id"];
-                    
-                    # Reset timeout monitoring on any message
-                    last_activity = time.time()
-                    no_activity_warned = False
-                    
-                    self.output_message(f"RCV {protocol.get_message_type_name(msg_type)} from {origin_id}", level="DEBUG")
-                    
-                    handler = self.message_handlers.get(msg_type)
-                    if handler:
-                        handler(header, payload)
-                    else:
-                        self.output_message(f"Unhandled msg type: {msg_type}", level="DEBUG")
-                        
+                    item = self.message_queue.get(timeout=max(deadline - current_time, 0))
                 except queue.Empty:
                     current_time = time.time()
                     
@@ -1463,23 +1551,36 @@ class HeartsGame:
                         last_token_time = current_time
                     
                     # Warning for no activity
-                    if current_time - last_activity > 30 and not no_activity_warned:
+                    if current_time - last_activity > NO_ACTIVITY_WARNING and not no_activity_warned:
                         self.output_message(f"No activity for {int(current_time - last_activity)}s - game may be stuck", level="INFO")
                         no_activity_warned = True
                     
-                    # Update token timing
-                    if self.has_token and not last_token_time:
-                        last_token_time = current_time
-                    elif not self.has_token:
-                        last_token_time = None
-                    
                     continue
+                
+                if item is None:  # Shutdown sentinel from stop()
+                    break
+                header, payload, _ = item
+                msg_type = header["type"]
+                
+                # Reset timeout monitoring on any message
+                last_activity = time.time()
+                no_activity_warned = False
+                
+                if self.verbose_mode:
+                    self.output_message(f"RCV {type_names[msg_type]} from {header['origin_id']}", level="DEBUG")
+                
+                handler = get_handler(msg_type)
+                if handler:
+                    handler(header, payload)
+                else:
+                    self.output_message(f"Unhandled msg type: {type_names[msg_type]}", level="DEBUG")
                     
         except KeyboardInterrupt:
             self.output_message("Shutting down...", level="DEBUG")
         finally:
             if self.network_node:
                 self.network_node.stop()
+            console.flush()
 
     def _handle_token_timeout(self):
         """Handle timeout when holding token too long."""
@@ -1511,4 +1612,4 @@ class HeartsGame:
         else:
             # Unknown state, just pass the token
             self.output_message("Token timeout in unknown state - passing token", level="INFO")
-            self.pass_token_to_player((self.player_id + 1) % 4)
\ No newline at end of file
+            self.pass_token_to_player((self.player_id + 1) & 3)
\ No newline at end of file
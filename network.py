@@ -1,21 +1,57 @@
 # Handles UDP socket communication and message passing in the ring.
+import queue
 import socket
 import threading
 import time
-from datetime import datetime # Added for timestamping
-from protocol import parse_message, create_message # Assuming protocol.py is in the same directory
+from collections import deque
+from console import console
+from protocol import parse_message, parse_messages, create_message # Assuming protocol.py is in the same directory
+
+class MessageInbox:
+    """Hands received messages to a single consumer thread.
+
+    Drop-in for the put/get(timeout) subset of queue.Queue: deque append/popleft are
+    atomic, so a get that finds messages waiting takes no lock; the Event is only
+    waited on when the inbox is empty.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._ready = threading.Event()
+
+    def put(self, item):
+        self._items.append(item)
+        self._ready.set()
+
+    def get(self, timeout=None):
+        """Pop the oldest message, waiting up to timeout seconds; raises queue.Empty on timeout."""
+        items = self._items
+        while True:
+            if items:
+                return items.popleft()
+            self._ready.clear()
+            if items:  # A put landed between the check and the clear
+                continue
+            if not self._ready.wait(timeout):
+                raise queue.Empty
+
 
 class NetworkNode:
     def __init__(self, my_id, my_port, next_node_ip, next_node_port, message_queue, verbose_mode=False): # Added verbose_mode
         self.my_id = my_id
         self.my_address = ("0.0.0.0", my_port) # Listen on all interfaces
         self.next_node_address = (next_node_ip, next_node_port)
-        self.message_queue = message_queue # A queue.Queue to pass received messages to the main logic
+        self.message_queue = message_queue # A queue.Queue or MessageInbox to pass received messages to the main logic
         self.verbose_mode = verbose_mode # Store verbose_mode
         
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.settimeout(1.0)  # Set a 1-second timeout for recvfrom
-        self.sock.bind(self.my_address)
+        self.sock.bind(self.my_address) # Blocking recvfrom; stop() wakes the listener with a datagram to self
+        
+        # One Event per sequence number we originated, set when that frame completes the ring.
+        # Keyed by the 8-bit seq, so it never holds more than 256 entries.
+        self._ring_returns = {}
+        # Held from queueing our local copy until the frame is on the wire (see send_message)
+        self._send_lock = threading.Lock()
         
         self.running = True
         self.listen_thread = threading.Thread(target=self._listen)
@@ -26,8 +62,7 @@ class NetworkNode:
         if level == "DEBUG" and not self.verbose_mode:
             return
         
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{timestamp}] [Node {self.my_id}] [{level}] {message}")
+        console.write(f"[Node {self.my_id}] [{level}] {message}", time.time())
 
     def start(self):
         self.listen_thread.start()
@@ -35,60 +70,122 @@ class NetworkNode:
 
     def _listen(self):
         message_count = 0
+        verbose = self.verbose_mode # Debug f-strings (hex dumps included) are only built when enabled
         while self.running:
             try:
                 data, addr = self.sock.recvfrom(1024) # Buffer size
+                if not self.running:
+                    break # Wake-up datagram sent by stop()
                 message_count += 1
-                self._log("DEBUG", f"Received raw data #{message_count} from {addr}: {data.hex()}") # Log raw data in hex for readability
-                header, payload = parse_message(data)
+                if verbose:
+                    self._log("DEBUG", f"Received raw data #{message_count} from {addr}: {data.hex()}") # Log raw data in hex for readability
+                # A datagram carries one message, or several from the same origin (see send_batch)
+                messages = parse_messages(data)
                 
-                if header:
-                    self._log("DEBUG", f"Parsed message #{message_count}: Type:{header['type']} Origin:{header['origin_id']} Dest:{header['dest_id']} Seq:{header['seq_num']}")
-                    
-                    # Special case: M0 (dealer) monitors all PASS_CARDS messages for synchronization
-                    should_process = (header["dest_id"] == self.my_id or 
-                                    header["dest_id"] == 0xFF or
-                                    (self.my_id == 0 and header["type"] == 0x05))  # 0x05 = PASS_CARDS
-                    
-                    if should_process:
-                        self._log("DEBUG", f"Message #{message_count} queued for processing (matches dest or broadcast)")
-                        self.message_queue.put((header, payload, addr))
-                    else:
-                        self._log("DEBUG", f"Message #{message_count} not for this node (dest:{header['dest_id']}, my_id:{self.my_id})")
+                if messages:
+                    from_self = messages[0][0]["origin_id"] == self.my_id
                     
-                    # If message is not from this node originally, forward it
-                    if header["origin_id"] != self.my_id:
-                        self._log("DEBUG", f"Forwarding message #{message_count} to next node {self.next_node_address}")
+                    # If the datagram is not from this node originally, forward it whole.
+                    # Forward before queueing: the game thread may react to these messages
+                    # (e.g. M0 closing a trick) and its reply must not overtake them on the ring.
+                    if not from_self:
+                        if verbose:
+                            self._log("DEBUG", f"Forwarding message #{message_count} to next node {self.next_node_address}")
                         self.send_message_raw(data, self.next_node_address)
-                    else:
-                        # Message completed the loop and returned to origin
-                        self._log("DEBUG", f"Message #{message_count} (Type: {header['type']}) from self completed loop - not forwarding")
-                        pass # Or handle confirmation if needed
+                    
+                    for header, payload in messages:
+                        if verbose:
+                            self._log("DEBUG", f"Parsed message #{message_count}: Type:{header['type']} Origin:{header['origin_id']} Dest:{header['dest_id']} Seq:{header['seq_num']}")
+                        
+                        if from_self:
+                            # Message completed the loop and returned to origin
+                            if verbose:
+                                self._log("DEBUG", f"Message #{message_count} (Type: {header['type']}) from self completed loop - not forwarding")
+                            returned = self._ring_returns.get(header["seq_num"])
+                            if returned is not None:
+                                returned.set() # Every node has seen (and queued) this frame
+                        
+                        # Our own self/broadcast messages were already queued by send_message;
+                        # don't hand the ring-completion copy to the game a second time
+                        already_delivered = (from_self and
+                                             (header["dest_id"] == self.my_id or header["dest_id"] == 0xFF))
+                        
+                        # Special case: M0 (dealer) monitors all PASS_CARDS messages for synchronization
+                        should_process = not already_delivered and (
+                                        header["dest_id"] == self.my_id or 
+                                        header["dest_id"] == 0xFF or
+                                        (self.my_id == 0 and header["type"] == 0x05))  # 0x05 = PASS_CARDS
+                        
+                        if should_process:
+                            if verbose:
+                                self._log("DEBUG", f"Message #{message_count} queued for processing (matches dest or broadcast)")
+                            self.message_queue.put((header, payload, addr))
+                        elif verbose:
+                            self._log("DEBUG", f"Message #{message_count} not for this node (dest:{header['dest_id']}, my_id:{self.my_id})")
                 else:
                     self._log("ERROR", f"Received invalid/unparseable message #{message_count} from {addr}. Data: {data.hex()}")
 
-            except socket.timeout:
-                continue # Just to allow checking self.running periodically if a timeout is set
             except Exception as e:
                 self._log("ERROR", f"Listening error after {message_count} messages: {e}")
                 if self.running: # Avoid printing errors if we are shutting down
                     time.sleep(0.1) # Avoid busy-looping on persistent errors
 
     def send_message(self, msg_type, origin_id, dest_id, seq_num, payload=b""):
+        """Send a message around the ring and return its sequence number (see wait_ring_return).
+
+        Local delivery and the send happen under one lock: the local copy is queued first, so it
+        is handled before any peer's reply to it, and another thread reacting to that copy can't
+        get its own message on the wire ahead of this one.
+        """
+        with self._send_lock:
+            message = self._prepare_message(msg_type, origin_id, dest_id, seq_num, payload)
+            self.send_message_raw(message, self.next_node_address)
+        return seq_num
+
+    def send_batch(self, messages):
+        """Send several messages around the ring in one datagram and return their sequence numbers.
+
+        messages is a list of (msg_type, origin_id, dest_id, seq_num, payload) tuples, all with
+        the same origin. Every node handles the frames in list order, as if sent one by one.
+        """
+        with self._send_lock:
+            frames = [self._prepare_message(*message) for message in messages]
+            self.send_message_raw(b"".join(frames), self.next_node_address)
+        return [message[3] for message in messages]
+
+    def _prepare_message(self, msg_type, origin_id, dest_id, seq_num, payload=b""):
+        """Build a frame, queue the local copy of self/broadcast messages and register its ring return."""
         message = create_message(msg_type, origin_id, dest_id, seq_num, payload)
         # Log before sending, as send_message_raw is also used for forwarding
-        self._log("DEBUG", f"Sending message to {self.next_node_address}: Type {msg_type}, Dest {dest_id}, Seq {seq_num}, Payload: {payload.hex()}")
+        if self.verbose_mode:
+            self._log("DEBUG", f"Sending message to {self.next_node_address}: Type {msg_type}, Dest {dest_id}, Seq {seq_num}, Payload: {bytes(payload).hex()}")
         
         # CRITICAL FIX: Handle self-delivery and broadcast messages properly
         # When sending to self or broadcast, ensure we process the message locally too
         if dest_id == self.my_id or dest_id == 0xFF:
-            self._log("DEBUG", f"Message for self/broadcast - processing locally before sending to ring")
+            if self.verbose_mode:
+                self._log("DEBUG", f"Message for self/broadcast - processing locally before sending to ring")
             # Parse and queue the message for local processing
             header, local_payload = parse_message(message)
             if header:
                 self.message_queue.put((header, local_payload, self.my_address))
         
-        self.send_message_raw(message, self.next_node_address)
+        # Register before sending so a fast return can't be missed
+        self._ring_returns[seq_num] = threading.Event()
+        return message
+
+    def wait_ring_return(self, seq_num, timeout):
+        """Block until our message seq_num has travelled the whole ring, or timeout expires.
+
+        Returns True if the message came back, False on timeout (e.g. a lost frame).
+        """
+        returned = self._ring_returns.get(seq_num)
+        if returned is None:
+            return False
+        if returned.wait(timeout):
+            return True
+        self._log("ERROR", f"Message seq {seq_num} did not return around the ring within {timeout}s")
+        return False
 
     def send_message_raw(self, message_bytes, address):
         # This is a low-level send, logging for forwarded messages can be done here if needed,
@@ -96,7 +193,8 @@ class NetworkNode:
         # self._log("DEBUG", f"Raw send to {address}: {message_bytes.hex()}") # Potentially too verbose
         try:
             self.sock.sendto(message_bytes, address)
-            self._log("DEBUG", f"Successfully sent {len(message_bytes)} bytes to {address}")
+            if self.verbose_mode:
+                self._log("DEBUG", f"Successfully sent {len(message_bytes)} bytes to {address}")
         except socket.error as e:
             self._log("ERROR", f"Failed to send message to {address}: {e}")
             # Check if it's a network unreachable error
@@ -108,8 +206,12 @@ class NetworkNode:
 
     def stop(self):
         self.running = False
-        # No need for the dummy message to self if socket has a timeout
         if self.listen_thread.is_alive():
+            # Unblock recvfrom so the listener can observe running == False
+            try:
+                self.sock.sendto(b"", ("127.0.0.1", self.my_address[1]))
+            except socket.error:
+                pass
             self.listen_thread.join(timeout=2) # Increased timeout slightly for join
         self.sock.close()
         self._log("INFO", "Stopped.")
@@ -12,6 +12,8 @@ PLAY_CARD = 0x06
 TRICK_SUMMARY = 0x07
 HAND_SUMMARY = 0x08
 GAME_OVER = 0x09
+DEAL_ALL_HANDS = 0x0A
+HAND_SUMMARY_AND_DEAL = 0x0B
 
 BROADCAST_ID = 0xFF
 
@@ -25,12 +27,17 @@ MESSAGE_TYPES = {
     0x06: "PLAY_CARD",
     0x07: "TRICK_SUMMARY",
     0x08: "HAND_SUMMARY",
-    0x09: "GAME_OVER"
+    0x09: "GAME_OVER",
+    0x0A: "DEAL_ALL_HANDS",
+    0x0B: "HAND_SUMMARY_AND_DEAL"
 }
 
+# Every possible TIPO_MSG byte resolved once, so logging a message type is a tuple index
+MESSAGE_TYPE_NAMES = tuple(MESSAGE_TYPES.get(t, f"Unknown(0x{t:02x})") for t in range(256))
+
 def get_message_type_name(msg_type):
     """Get readable name for message type."""
-    return MESSAGE_TYPES.get(msg_type, f"Unknown(0x{msg_type:02x})")
+    return MESSAGE_TYPE_NAMES[msg_type]
 
 # Card Representation (from Especificação.md Section 5)
 # Bits 0-3 (Value): 1: Ace, ..., 10: Ten, 11: Jack (J), 12: Queen (Q), 13: King (K).
@@ -40,6 +47,10 @@ SUITS = {"DIAMONDS": 0, "CLUBS": 1, "HEARTS": 2, "SPADES": 3}
 # Values according to specification: 1-13 (Ace is 1, not 14)
 VALUES = {"A": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "10": 10, "J": 11, "Q": 12, "K": 13}
 
+# Reverse lookups for decode_card, indexed by the numeric field (None where unused)
+VALUE_NAMES = tuple(next((k for k, v in VALUES.items() if v == n), None) for n in range(16))
+SUIT_NAMES = tuple(next((k for k, v in SUITS.items() if v == n), None) for n in range(4))
+
 # Pass direction constants (from START_PHASE message)
 PASS_LEFT = 0
 PASS_RIGHT = 1
@@ -62,51 +73,60 @@ def decode_card(card_byte):
     suit = (card_byte >> 4) & 0x03
     
     # Find value string - handle invalid values
-    value_matches = [k for k, v in VALUES.items() if v == value]
-    if not value_matches:
+    value_str = VALUE_NAMES[value]
+    if value_str is None:
         raise ValueError(f"Invalid card value: {value} (from byte {card_byte:02x})")
-    value_str = value_matches[0]
     
-    # Find suit string - handle invalid suits
-    suit_matches = [k for k, v in SUITS.items() if v == suit]
-    if not suit_matches:
-        raise ValueError(f"Invalid card suit: {suit} (from byte {card_byte:02x})")
-    suit_str = suit_matches[0]
-    
-    return value_str, suit_str
+    # Every 2-bit suit is valid
+    return value_str, SUIT_NAMES[suit]
 
 # Message Structure (from Especificação.md Section 3)
 # TIPO_MSG (1 byte) | ORIGEM_ID (1 byte) | DESTINO_ID (1 byte) | SEQ_NUM (1 byte) | TAM_PAYLOAD (1 byte) | PAYLOAD (até 255 bytes)
 HEADER_FORMAT = "!BBBBB"
 HEADER_SIZE = 5 # 5 bytes
+HEADER_STRUCT = struct.Struct(HEADER_FORMAT)
+
+# Fixed-size payload layouts (from Especificação.md Section 4), compiled once
+TRICK_SUMMARY_STRUCT = struct.Struct("!10B") # winner, 4x (player_id, card), points
+PLAYED_CARD_STRUCT = struct.Struct("!BB") # One (player_id, card) entry of TRICK_SUMMARY
+# Scores are signed: choosing to subtract 26 after shooting the moon makes a hand score (and possibly a total) negative
+HAND_SUMMARY_STRUCT = struct.Struct("!4b4hB") # 4x hand points (int8), 4x total points (int16), shoot-the-moon id
+GAME_OVER_STRUCT = struct.Struct("!B4h") # winner, 4x final points (int16)
 
 def create_message(msg_type, origin_id, dest_id, seq_num, payload=b""):
-    """Creates a message with header and payload."""
+    """Creates a message with header and payload.
+    
+    The frame is a single bytearray: the header is packed in place and the payload
+    (any bytes-like object, e.g. a memoryview slice) is copied in once.
+    """
     tam_payload = len(payload)
-    header = struct.pack(HEADER_FORMAT, msg_type, origin_id, dest_id, seq_num, tam_payload)
-    return header + payload
+    message = bytearray(HEADER_SIZE + tam_payload)
+    HEADER_STRUCT.pack_into(message, 0, msg_type, origin_id, dest_id, seq_num, tam_payload)
+    message[HEADER_SIZE:] = payload
+    return message
 
-def parse_message(message_bytes):
-    """Parses a message into header and payload."""
-    if len(message_bytes) < HEADER_SIZE:
+def parse_message(message_bytes, offset=0):
+    """Parses a message (starting at offset) into header and payload."""
+    if len(message_bytes) < offset + HEADER_SIZE:
         return None, None # Not enough bytes for a header
     
-    header_tuple = struct.unpack(HEADER_FORMAT, message_bytes[:HEADER_SIZE])
+    header_tuple = HEADER_STRUCT.unpack_from(message_bytes, offset)
     msg_type, origin_id, dest_id, seq_num, tam_payload = header_tuple
     
-    # Validate message type according to specification (0x01-0x09)
-    if msg_type < 0x01 or msg_type > 0x09:
+    # Validate message type according to specification (0x01-0x0B)
+    if msg_type < 0x01 or msg_type > 0x0B:
         return None, None
     
     # Validate node IDs (0-3) or broadcast (0xFF)
     if origin_id > 3 or (dest_id > 3 and dest_id != 0xFF):
         return None, None
     
-    payload_end = HEADER_SIZE + tam_payload
+    payload_start = offset + HEADER_SIZE
+    payload_end = payload_start + tam_payload
     if len(message_bytes) < payload_end:
         return None, None # Not enough bytes for the declared payload
         
-    payload = message_bytes[HEADER_SIZE:payload_end]
+    payload = message_bytes[payload_start:payload_end]
     
     header = {
         "type": msg_type,
@@ -117,3 +137,18 @@ def parse_message(message_bytes):
     }
     return header, payload
 
+def parse_messages(datagram):
+    """Parses every message packed back to back in one datagram into a list of (header, payload).
+    
+    Frames are self-delimiting through TAM_PAYLOAD; parsing stops at the first invalid frame.
+    """
+    messages = []
+    offset = 0
+    while offset < len(datagram):
+        header, payload = parse_message(datagram, offset)
+        if header is None:
+            break
+        messages.append((header, payload))
+        offset += HEADER_SIZE + header["payload_size"]
+    return messages
+
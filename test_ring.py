@@ -4,32 +4,37 @@ Simple test script to verify the ring network communication works.
 This sends basic messages around the ring without any game logic.
 """
 import argparse
+import itertools
 import queue
+import sys
 import time
 import threading
-from datetime import datetime
 
+from console import format_timestamp
 from network import NetworkNode
 import protocol
 
 # Configuration
 PORTS = {0: 49152, 1: 49153, 2: 49154, 3: 49155}  # Using ports from the dynamic/private range
 NEXT_NODE_IPS = {0: "127.0.0.1", 1: "127.0.0.1", 2: "127.0.0.1", 3: "127.0.0.1"}
+RING_TIMEOUT = 2.0  # Seconds a test message gets to come back before the ring counts as broken
 
 def log_with_timestamp(message):
     """Helper function to add timestamps to log messages."""
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]  # Include milliseconds
+    timestamp = format_timestamp(time.time())  # HH:MM:SS.mmm
     return f"[{timestamp}] {message}"
 
 def main():
     parser = argparse.ArgumentParser(description="Simple Ring Network Test")
     parser.add_argument("player_id", type=int, choices=[0, 1, 2, 3], help="ID of this node (0-3)")
+    parser.add_argument("--rounds", type=int, default=0,
+                        help="Node 0 only: send this many test messages, then exit with status 1 if any failed (0 = run forever)")
     args = parser.parse_args()
 
     my_id = args.player_id
     my_port = PORTS[my_id]
     
-    next_player_id = (my_id + 1) % 4
+    next_player_id = (my_id + 1) & 3
     next_node_ip = NEXT_NODE_IPS[my_id]
     next_node_port = PORTS[next_player_id]
 
@@ -42,30 +47,48 @@ def main():
     print(log_with_timestamp(f"Node {my_id} started. Listening on port {my_port}, forwarding to {next_node_ip}:{next_node_port}"))
 
     # Simple sequence counter for this node
-    seq_counter = 0
+    seq_iter = itertools.count()
 
     def get_next_seq():
-        nonlocal seq_counter
-        val = seq_counter
-        seq_counter = (seq_counter + 1) % 256
-        return val
+        return next(seq_iter) & 0xFF
 
-    # Node 0 initiates the test
-    if my_id == 0:
+    def send_and_verify(text):
+        """Send a test message and wait for it to come back around the ring; returns True if it did."""
+        seq = get_next_seq()
+        sent_at = time.time()
+        network_node.send_message(protocol.GAME_START, my_id, protocol.BROADCAST_ID, seq, text.encode('utf-8'))
+        # Our own broadcast is also queued locally, so only the ring return proves connectivity
+        if network_node.wait_ring_return(seq, RING_TIMEOUT):
+            print(log_with_timestamp(f"Node {my_id}: Message #{seq} completed the ring! Round-trip time: {time.time() - sent_at:.3f}s"))
+            return True
+        print(log_with_timestamp(f"Node {my_id}: ❌ Message #{seq} did not come back within {RING_TIMEOUT}s - RING BROKEN"))
+        return False
+
+    results = []
+    finished = threading.Event()
+
+    def run_rounds():
+        """Node 0: send a test message every 5 seconds, stopping after --rounds if given."""
         print(log_with_timestamp("Node 0 waiting 5 seconds for other nodes to start..."))
         time.sleep(5)
-        
-        # Send a simple test message
-        print(log_with_timestamp("Node 0 sending TEST message around the ring..."))
-        seq = get_next_seq()
-        test_payload = f"Hello from Node {my_id}".encode('utf-8')
-        network_node.send_message(protocol.GAME_START, my_id, protocol.BROADCAST_ID, seq, test_payload)
+        while True:
+            print(log_with_timestamp("Node 0 sending TEST message around the ring..."))
+            results.append(send_and_verify(f"Test message #{len(results)} from Node {my_id}"))
+            if args.rounds and len(results) >= args.rounds:
+                finished.set()
+                return
+            print(log_with_timestamp("Node 0 will send another message in 5 seconds..."))
+            time.sleep(5)
+
+    # Node 0 initiates the test
+    if my_id == 0:
+        threading.Thread(target=run_rounds, daemon=True).start()
 
     message_count = 0
     start_time = time.time()
 
     try:
-        while True:
+        while not finished.is_set():
             try:
                 header, payload, source_addr = message_q.get(timeout=1.0)
                 message_count += 1
@@ -84,32 +107,14 @@ def main():
                     except:
                         print(log_with_timestamp(f"  Payload: {len(payload)} bytes"))
 
-                # If this message originated from this node, it completed the ring
-                if origin_id == my_id:
-                    elapsed = time.time() - start_time
-                    print(log_with_timestamp(f"Node {my_id}: Message completed the ring! Round-trip time: {elapsed:.3f}s"))
-                    
-                    # Send another test message every 5 seconds
-                    if my_id == 0:
-                        print(log_with_timestamp("Node 0 will send another message in 5 seconds..."))
-                        
-                        def send_delayed():
-                            time.sleep(5)
-                            seq = get_next_seq()
-                            test_payload = f"Test message #{seq} from Node {my_id}".encode('utf-8')
-                            network_node.send_message(protocol.GAME_START, my_id, protocol.BROADCAST_ID, seq, test_payload)
-                            print(log_with_timestamp(f"Node 0 sent test message #{seq}"))
-                        
-                        threading.Thread(target=send_delayed, daemon=True).start()
-
             except queue.Empty:
                 # Timeout - check if we should send a message
                 if my_id != 0 and message_count == 0 and time.time() - start_time > 10:
                     # If we haven't received anything after 10 seconds, try sending our own test
                     print(log_with_timestamp(f"Node {my_id}: No messages received, sending test message..."))
-                    seq = get_next_seq()
-                    test_payload = f"Test from Node {my_id} (no messages received)".encode('utf-8')
-                    network_node.send_message(protocol.GAME_START, my_id, protocol.BROADCAST_ID, seq, test_payload)
+                    message_count += 1  # Only try once
+                    threading.Thread(target=send_and_verify, args=(f"Test from Node {my_id} (no messages received)",),
+                                     daemon=True).start()
                 continue
                 
     except KeyboardInterrupt:
@@ -117,5 +122,10 @@ def main():
     finally:
         network_node.stop()
 
+    if finished.is_set():
+        passed = results.count(True)
+        print(log_with_timestamp(f"Node {my_id}: {passed}/{len(results)} test messages completed the ring"))
+        sys.exit(0 if passed == len(results) else 1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,11 +5,12 @@ This creates a simple ring between two machines to verify network connectivity.
 Each machine runs two nodes to complete the ring: Machine1(Node0,Node1) <-> Machine2(Node2,Node3)
 """
 import argparse
+import itertools
 import queue
 import time
 import threading
-from datetime import datetime
 
+from console import format_timestamp
 from network import NetworkNode
 import protocol
 
@@ -20,6 +21,7 @@ MACHINE_2_IP = "192.168.100.18"  # Replace with actual IP of machine 2
 
 # Port configuration
 PORTS = {0: 49160, 1: 49161, 2: 49162, 3: 49163}
+RING_TIMEOUT = 3.0  # Seconds a test message gets to come back before the ring counts as broken
 
 def get_network_config_for_machine(machine_num):
     """Get network configuration based on which machine we're running on."""
@@ -44,7 +46,7 @@ def get_network_config_for_machine(machine_num):
 
 def log_with_timestamp(message):
     """Helper function to add timestamps to log messages."""
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    timestamp = format_timestamp(time.time())  # HH:MM:SS.mmm
     return f"[{timestamp}] {message}"
 
 class TwoMachineRingTest:
@@ -68,13 +70,13 @@ class TwoMachineRingTest:
     def start_node(self, node_id):
         """Start a single node."""
         my_port = PORTS[node_id]
-        next_node_id = (node_id + 1) % 4
+        next_node_id = (node_id + 1) & 3
         next_node_ip = self.config["next_ips"][node_id]
         next_node_port = PORTS[next_node_id]
 
         message_q = queue.Queue()
         self.message_queues[node_id] = message_q
-        self.seq_counters[node_id] = 0
+        self.seq_counters[node_id] = itertools.count()
 
         # Initialize NetworkNode
         network_node = NetworkNode(node_id, my_port, next_node_ip, next_node_port, message_q, verbose_mode=True)
@@ -85,23 +87,35 @@ class TwoMachineRingTest:
 
     def get_next_seq(self, node_id):
         """Get next sequence number for a node."""
-        val = self.seq_counters[node_id]
-        self.seq_counters[node_id] = (val + 1) % 256
-        return val
+        return next(self.seq_counters[node_id]) & 0xFF
 
     def send_test_message(self, from_node_id, message_text):
-        """Send a test message from a specific node."""
+        """Send a test message from a specific node and wait for it to come back around the ring.
+
+        Returns True if it completed the ring. Blocks for up to RING_TIMEOUT, so call it off the monitor loop.
+        """
         if from_node_id not in self.nodes:
-            return
+            return False
         
         seq = self.get_next_seq(from_node_id)
         payload = f"[Machine{self.machine_num}] {message_text}".encode('utf-8')
         
-        self.nodes[from_node_id].send_message(
-            protocol.GAME_START, from_node_id, protocol.BROADCAST_ID, seq, payload
-        )
-        
+        node = self.nodes[from_node_id]
+        node.send_message(protocol.GAME_START, from_node_id, protocol.BROADCAST_ID, seq, payload)
         print(log_with_timestamp(f"Machine {self.machine_num}: Node {from_node_id} sent test message"))
+        
+        # The sender's own broadcast is also queued locally, so only the ring return proves connectivity
+        if node.wait_ring_return(seq, RING_TIMEOUT):
+            print(log_with_timestamp(
+                f"Machine {self.machine_num}: Message from our Node {from_node_id} completed the ring! "
+                f"✅ RING CONNECTIVITY VERIFIED"
+            ))
+            return True
+        print(log_with_timestamp(
+            f"Machine {self.machine_num}: Message from our Node {from_node_id} did not come back within {RING_TIMEOUT}s! "
+            f"❌ RING BROKEN"
+        ))
+        return False
 
     def monitor_messages(self):
         """Monitor messages received by all nodes on this machine."""
@@ -145,22 +159,14 @@ class TwoMachineRingTest:
                             except:
                                 print(log_with_timestamp(f"  Payload: {len(payload)} bytes"))
 
-                        # Check if message completed the ring
-                        if origin_id in self.config["nodes"]:
-                            print(log_with_timestamp(
-                                f"Machine {self.machine_num}: Message from our Node {origin_id} completed the ring! "
-                                f"✅ RING CONNECTIVITY VERIFIED"
-                            ))
+                        # Machine 2 answers the first messages it gets from the other machine (seen once, on Node 2)
+                        if node_id == 2 and origin_id not in self.config["nodes"] and message_counts[node_id] <= 2:
+                            def send_response(origin_id):
+                                time.sleep(1)
+                                response_node = 2 if origin_id == 0 else 3
+                                self.send_test_message(response_node, f"Response to Node {origin_id} - Ring working!")
                             
-                            # Send a response message after completing ring
-                            if self.machine_num == 2 and message_counts[node_id] <= 2:
-                                def send_response():
-                                    time.sleep(1)
-                                    response_node = 2 if origin_id == 0 else 3
-                                    if response_node in self.nodes:
-                                        self.send_test_message(response_node, f"Response to Node {origin_id} - Ring working!")
-                                
-                                threading.Thread(target=send_response, daemon=True).start()
+                            threading.Thread(target=send_response, args=(origin_id,), daemon=True).start()
                     
                     except queue.Empty:
                         continue